@@ -85,12 +85,37 @@ class HalJsonSrcDataset(Dataset):
         """
 
 class Dataset(object):
-    def download_with_validation(self, dst_dir: pathlib.Path, limit: int = 0) -> None:
-        """blocking call, using rust's async runtime"""
+    def download_with_validation(self, dst_dir: pathlib.Path, limit: int = 8) -> None:
+        """blocking call, using rust's async runtime.
+
+        Args:
+            dst_dir: Destination directory for downloaded files.
+            limit: Maximum number of concurrent downloads, `0` means no limit. Defaults to 8.
+        """
     def crawl_file(self) -> SyncAsyncIterator[FileEntry]:
         """returns a stream that can be either sync or async iterator over `FileEntry`"""
     def crawl(self) -> SyncAsyncIterator[FileEntry | DirEntry]:
         """returns a stream that can be either sync or async iterator over `FileEntry | DirEntry`"""
+    def crawl_batched(
+        self, batch_size: int = 256
+    ) -> SyncAsyncIterator[list[FileEntry | DirEntry]]:
+        """same as `crawl`, but yields lists of up to `batch_size` entries.
+
+        Each list holds the entries already crawled (at most `batch_size`), it is handed over
+        as soon as one entry is available rather than waiting for the batch to fill up.
+        A crawl error is raised by the call after the list holding the entries before it.
+
+        Args:
+            batch_size: Maximum number of entries per list. Defaults to 256.
+        """
+    def refresh(self) -> None:
+        """forget the cached crawl result.
+
+        A crawl that runs to completion is remembered by the dataset, later `crawl`,
+        `crawl_file` and `crawl_batched` calls reuse it instead of querying the repository
+        again (`download_with_validation` always crawls). After `refresh`, the next call
+        crawls again.
+        """
     def root_url(self) -> str: ...
 
 def resolve(url: str, /) -> Dataset:
@@ -100,6 +125,9 @@ class DOIResolver:
     def __init__(self, timeout: int = 5) -> None:
         """Create a new DOIResolver instance.
 
+        Successful resolutions are remembered by the instance (up to 1024 of them, the least
+        recently used is forgotten first), resolving the same DOI again does not hit the network.
+
         Args:
             timeout: HTTP timeout in seconds. Defaults to 5.
         """
@@ -108,12 +136,26 @@ class DOIResolver:
 
         Args:
             doi: The DOI to resolve, e.g. '10.1000/xyz123'.
-            follow_redirects: Whether to follow redirects. Defaults to True.
+            follow_redirects: Whether to follow redirects, starting from https://doi.org/<doi>
+                and up to 6 hops. Defaults to True.
+        """
+    def resolve_many(
+        self, dois: list[str], follow_redirects: bool = True, concurrency: int = 16
+    ) -> list[str]:
+        """Resolve multiple DOIs to URLs, in the order of `dois`.
+
+        Args:
+          dois: List of DOIs to resolve.
+          follow_redirects: Whether to follow redirects. Defaults to True.
+          concurrency: Maximum number of DOIs resolved at once, `0` means no limit. Defaults to 16.
         """
-    def resolve_many(self, dois: list[str], follow_redirects: bool = True) -> list[str]:
-        """Resolve multiple DOIs to URLs.
+    async def resolve_many_async(
+        self, dois: list[str], follow_redirects: bool = True, concurrency: int = 16
+    ) -> list[str]:
+        """Resolve multiple DOIs to URLs without blocking the event loop, in the order of `dois`.
 
         Args:
           dois: List of DOIs to resolve.
           follow_redirects: Whether to follow redirects. Defaults to True.
+          concurrency: Maximum number of DOIs resolved at once, `0` means no limit. Defaults to 16.
         """
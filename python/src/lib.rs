@@ -20,10 +20,10 @@ pub fn main() {
 use datahugger::datasets::ZenodoJsonSrcDataset;
 use datahugger::datasets::{DataverseJsonSrcDataset, HalJsonSrcDataset};
 use datahugger::{
-    crawl,
-    crawler::{CrawlerError, ProgressManager},
-    resolve as inner_resolve, resolve_doi_to_url as inner_resolve_doi_to_url, CrawlExt, Dataset,
-    DownloadExt, Entry, FileMeta,
+    crawler::{prefetch, Batched, CrawlerError, ProgressManager},
+    resolve as inner_resolve, resolve_doi_to_url as inner_resolve_doi_to_url,
+    resolve_dois_to_urls as inner_resolve_dois_to_urls, CrawlExt, Dataset, DoiCache, DownloadExt,
+    Entry, FileMeta,
 };
 use exn::Exn;
 use futures_core::stream::BoxStream;
@@ -39,9 +39,36 @@ use reqwest::redirect::Policy;
 use reqwest::{Client, ClientBuilder, Url};
 use std::collections::HashMap;
 use std::time::Duration;
-use std::{path::PathBuf, sync::Arc};
+use std::{
+    path::PathBuf,
+    sync::{Arc, LazyLock, Mutex as StdMutex, MutexGuard, PoisonError},
+};
 use tokio::sync::Mutex;
 
+// One client for every dataset so that connections (and TLS sessions) are pooled across
+// `resolve`, `crawl` and `download_with_validation` calls. Its connections are driven by the
+// runtime of `pyo3_async_runtimes`, which therefore is the only runtime used for those calls.
+static HTTP_CLIENT: LazyLock<Result<Client, String>> = LazyLock::new(|| {
+    let user_agent = format!("datahugger-py/{}", env!("CARGO_PKG_VERSION"));
+    ClientBuilder::new()
+        .user_agent(user_agent)
+        .pool_max_idle_per_host(32)
+        .pool_idle_timeout(Duration::from_secs(90))
+        // servers negotiating HTTP/2 multiplex the concurrent downloads over one connection,
+        // size its flow control windows from the measured bandwidth-delay product so a
+        // single connection is not capped by the 64 KiB default window.
+        .http2_adaptive_window(true)
+        .build()
+        .map_err(|err| err.to_string())
+});
+
+fn http_client() -> PyResult<Client> {
+    HTTP_CLIENT
+        .as_ref()
+        .map(Client::clone)
+        .map_err(|err| PyRuntimeError::new_err(format!("http client fail: {err}")))
+}
+
 pub trait CrawlFileExt {
     fn crawl_file(
         self,
@@ -56,13 +83,14 @@ impl CrawlFileExt for Dataset {
         client: &Client,
         mp: impl ProgressManager,
     ) -> BoxStream<'static, Result<FileMeta, Exn<CrawlerError>>> {
-        let root_dir = self.root_dir();
-        crawl(
-            client.clone(),
-            Arc::clone(&self.backend),
-            root_dir,
-            mp.clone(),
-        )
+        files_only(CrawlExt::crawl(self, client, mp))
+    }
+}
+
+fn files_only(
+    entries: BoxStream<'static, Result<Entry, Exn<CrawlerError>>>,
+) -> BoxStream<'static, Result<FileMeta, Exn<CrawlerError>>> {
+    entries
         .filter_map(|res| async move {
             match res {
                 Ok(Entry::Dir(_)) => None,
@@ -71,7 +99,6 @@ impl CrawlFileExt for Dataset {
             }
         })
         .boxed()
-    }
 }
 
 #[pyclass]
@@ -136,21 +163,15 @@ impl PyDataverseJsonSrcDataset {
 
         let version = ":latest-published".to_string();
 
-        let ds = Dataset {
-            backend: Arc::new(DataverseJsonSrcDataset::new(
-                id, &base_url, version, content,
-            )),
-        };
+        let ds = Dataset::new(DataverseJsonSrcDataset::new(
+            id, &base_url, version, content,
+        ));
         Ok(Self {
             inner: PyDataset(ds),
         })
     }
     fn crawl_file(&self) -> PyResult<PyFileMetaStream> {
-        let user_agent = format!("datahugger-py/{}", env!("CARGO_PKG_VERSION"));
-        let client = ClientBuilder::new()
-            .user_agent(user_agent)
-            .build()
-            .map_err(|err| PyRuntimeError::new_err(format!("http client fail: {err}")))?;
+        let client = http_client()?;
         let mp = NoProgress;
 
         let stream = self.inner.0.clone().crawl_file(&client, mp);
@@ -169,20 +190,14 @@ struct PyZenodoJsonSrcDataset {
 impl PyZenodoJsonSrcDataset {
     #[new]
     fn new(id: String, content: String) -> PyResult<Self> {
-        let ds = Dataset {
-            backend: Arc::new(ZenodoJsonSrcDataset::new(id, content)),
-        };
+        let ds = Dataset::new(ZenodoJsonSrcDataset::new(id, content));
         Ok(Self {
             inner: PyDataset(ds),
         })
     }
 
     fn crawl_file(&self) -> PyResult<PyFileMetaStream> {
-        let user_agent = format!("datahugger-py/{}", env!("CARGO_PKG_VERSION"));
-        let client = ClientBuilder::new()
-            .user_agent(user_agent)
-            .build()
-            .map_err(|err| PyRuntimeError::new_err(format!("http client fail: {err}")))?;
+        let client = http_client()?;
         let mp = NoProgress;
 
         let stream = self.inner.0.clone().crawl_file(&client, mp);
@@ -201,20 +216,14 @@ struct PyHalJsonSrcDataset {
 impl PyHalJsonSrcDataset {
     #[new]
     fn new(id: String, content: String) -> PyResult<Self> {
-        let ds = Dataset {
-            backend: Arc::new(HalJsonSrcDataset::new(id, content)),
-        };
+        let ds = Dataset::new(HalJsonSrcDataset::new(id, content));
         Ok(Self {
             inner: PyDataset(ds),
         })
     }
 
     fn crawl_file(&self) -> PyResult<PyFileMetaStream> {
-        let user_agent = format!("datahugger-py/{}", env!("CARGO_PKG_VERSION"));
-        let client = ClientBuilder::new()
-            .user_agent(user_agent)
-            .build()
-            .map_err(|err| PyRuntimeError::new_err(format!("http client fail: {err}")))?;
+        let client = http_client()?;
         let mp = NoProgress;
 
         let stream = self.inner.0.clone().crawl_file(&client, mp);
@@ -225,21 +234,17 @@ impl PyHalJsonSrcDataset {
 
 #[pymethods]
 impl PyDataset {
-    #[pyo3(signature = (dst_dir, limit=0))]
+    #[pyo3(signature = (dst_dir, limit=8))]
     fn download_with_validation(
         self_: PyRef<'_, Self>,
         dst_dir: PathBuf,
         limit: usize,
     ) -> PyResult<()> {
-        let user_agent = format!("datahugger-py/{}", env!("CARGO_PKG_VERSION"));
-        let client = ClientBuilder::new()
-            .user_agent(user_agent)
-            .build()
-            .map_err(|err| PyRuntimeError::new_err(format!("http client fail: {err}")))?;
+        let client = http_client()?;
         let mp = NoProgress;
 
         // blocking call to download, not ideal, but just to sync with original API.
-        let rt = tokio::runtime::Runtime::new().expect("unable to create tokio runtime");
+        let rt = pyo3_async_runtimes::tokio::get_runtime();
         rt.block_on(async move {
             self_
                 .0
@@ -250,42 +255,99 @@ impl PyDataset {
         .map_err(|err| PyRuntimeError::new_err(format!("{err}")))
     }
 
+    fn refresh(self_: PyRef<'_, Self>) {
+        self_.0.refresh();
+    }
+
     fn root_url(self_: PyRef<'_, Self>) -> String {
         let repo = self_.0.backend.clone();
         repo.root_url().as_str().into()
     }
 
     fn crawl(self_: PyRef<'_, Self>) -> PyResult<PyEntryStream> {
-        let user_agent = format!("datahugger-py/{}", env!("CARGO_PKG_VERSION"));
-        let client = ClientBuilder::new()
-            .user_agent(user_agent)
-            .build()
-            .map_err(|err| PyRuntimeError::new_err(format!("http client fail: {err}")))?;
+        let client = http_client()?;
         let mp = NoProgress;
 
-        let stream = self_.0.clone().crawl(&client, mp);
+        let stream = self_.0.clone().crawl_cached(&client, mp);
         let stream = PyEntryStream::new(stream);
         Ok(stream)
     }
 
     fn crawl_file(self_: PyRef<'_, Self>) -> PyResult<PyFileMetaStream> {
-        let user_agent = format!("datahugger-py/{}", env!("CARGO_PKG_VERSION"));
-        let client = ClientBuilder::new()
-            .user_agent(user_agent)
-            .build()
-            .map_err(|err| PyRuntimeError::new_err(format!("http client fail: {err}")))?;
+        let client = http_client()?;
         let mp = NoProgress;
 
-        let stream = self_.0.clone().crawl_file(&client, mp);
+        // the JSON source datasets crawl from memory, only repository datasets are cached.
+        let stream = files_only(self_.0.clone().crawl_cached(&client, mp));
         let stream = PyFileMetaStream::new(stream);
         Ok(stream)
     }
+
+    #[pyo3(signature = (batch_size=256))]
+    fn crawl_batched(self_: PyRef<'_, Self>, batch_size: usize) -> PyResult<PyEntryBatchStream> {
+        let client = http_client()?;
+        let mp = NoProgress;
+
+        let stream = self_.0.clone().crawl_cached(&client, mp);
+        let stream = PyEntryBatchStream::new(stream, batch_size);
+        Ok(stream)
+    }
 }
 
+/// Maximum number of DOI resolutions remembered by a `DOIResolver`.
+const DOI_CACHE_CAPACITY: usize = 1024;
+
+fn lock_cache(cache: &StdMutex<DoiCache>) -> MutexGuard<'_, DoiCache> {
+    // the cache holds no invariant a panicking holder could break, keep using it.
+    cache.lock().unwrap_or_else(PoisonError::into_inner)
+}
+
+/// Resolves `dois`, only sending requests for the ones not in `cache`.
+async fn resolve_many_cached(
+    client: &Client,
+    cache: &StdMutex<DoiCache>,
+    dois: Vec<String>,
+    follow_redirects: bool,
+    concurrency: usize,
+) -> PyResult<Vec<String>> {
+    let cached = {
+        let mut cache = lock_cache(cache);
+        dois.iter()
+            .map(|doi| cache.get(doi, follow_redirects))
+            .collect::<Vec<_>>()
+    };
+    let missing = dois
+        .iter()
+        .zip(&cached)
+        .filter_map(|(doi, url)| url.is_none().then_some(doi))
+        .collect::<Vec<_>>();
+    let mut resolved = inner_resolve_dois_to_urls(client, &missing, follow_redirects, concurrency)
+        .await
+        .into_iter();
+
+    let mut cache = lock_cache(cache);
+    dois.into_iter()
+        .zip(cached)
+        .map(|(doi, url)| match url {
+            Some(url) => Ok(url),
+            None => {
+                let url = resolved
+                    .next()
+                    .expect("one resolution per missing DOI")
+                    .map_err(|err| PyRuntimeError::new_err(format!("{err}")))?;
+                cache.insert(doi, follow_redirects, url.clone());
+                Ok(url)
+            }
+        })
+        .collect()
+}
+
+// Runs on the runtime of `pyo3_async_runtimes` for both the blocking and the async methods,
+// so the pooled connections of `client` are always driven by the same runtime.
 #[pyclass]
 struct DOIResolver {
-    runtime: tokio::runtime::Runtime,
     client: Client,
+    cache: Arc<StdMutex<DoiCache>>,
 }
 
 #[pymethods]
@@ -294,54 +356,90 @@ impl DOIResolver {
     #[pyo3(signature = (timeout=5))]
     fn new(timeout: u64) -> PyResult<Self> {
         Ok(Self {
-            runtime: tokio::runtime::Runtime::new().map_err(|err| {
-                PyRuntimeError::new_err(format!("failed to create runtime: {err}"))
-            })?,
             client: Client::builder()
                 .use_native_tls()
                 .timeout(Duration::from_secs(timeout))
-                .redirect(Policy::limited(5)) // limit number of redirects (relevant if follow_redirects is set to true)
+                // one pool shared by all DOIs of a batch, see `resolve_many`.
+                .pool_max_idle_per_host(32)
+                // limit number of redirects (relevant if follow_redirects is set to true), the
+                // first hop is https://doi.org itself so allow one more than the publisher needs.
+                .redirect(Policy::limited(6))
                 .build()
                 .map_err(|err| {
                     PyRuntimeError::new_err(format!("failed to create client: {err}"))
                 })?,
+            cache: Arc::new(StdMutex::new(DoiCache::new(DOI_CACHE_CAPACITY))),
         })
     }
 
     #[pyo3(signature = (doi, follow_redirects=true))]
     fn resolve(&self, doi: String, follow_redirects: bool) -> PyResult<String> {
-        self.runtime
+        if let Some(url) = lock_cache(&self.cache).get(&doi, follow_redirects) {
+            return Ok(url);
+        }
+        let rt = pyo3_async_runtimes::tokio::get_runtime();
+        let url = rt
             .block_on(inner_resolve_doi_to_url(
                 &self.client,
                 &doi,
                 follow_redirects,
             ))
-            .map_err(|err| PyRuntimeError::new_err(format!("{err}")))
-    }
-
-    #[pyo3(signature = (dois, follow_redirects=true))]
-    fn resolve_many(&self, dois: Vec<String>, follow_redirects: bool) -> PyResult<Vec<String>> {
-        let futures = dois
-            .iter()
-            .map(|doi| inner_resolve_doi_to_url(&self.client, doi, follow_redirects));
-        self.runtime
-            .block_on(futures::future::join_all(futures))
-            .into_iter()
-            .collect::<Result<Vec<String>, _>>()
-            .map_err(|err| PyRuntimeError::new_err(format!("{err}")))
+            .map_err(|err| PyRuntimeError::new_err(format!("{err}")))?;
+        lock_cache(&self.cache).insert(doi, follow_redirects, url.clone());
+        Ok(url)
+    }
+
+    #[pyo3(signature = (dois, follow_redirects=true, concurrency=16))]
+    fn resolve_many(
+        &self,
+        dois: Vec<String>,
+        follow_redirects: bool,
+        concurrency: usize,
+    ) -> PyResult<Vec<String>> {
+        let rt = pyo3_async_runtimes::tokio::get_runtime();
+        rt.block_on(resolve_many_cached(
+            &self.client,
+            &self.cache,
+            dois,
+            follow_redirects,
+            concurrency,
+        ))
+    }
+
+    #[pyo3(signature = (dois, follow_redirects=true, concurrency=16))]
+    fn resolve_many_async<'py>(
+        &self,
+        py: Python<'py>,
+        dois: Vec<String>,
+        follow_redirects: bool,
+        concurrency: usize,
+    ) -> PyResult<Bound<'py, PyAny>> {
+        let client = self.client.clone();
+        let cache = Arc::clone(&self.cache);
+        future_into_py(py, async move {
+            resolve_many_cached(&client, &cache, dois, follow_redirects, concurrency).await
+        })
     }
 }
 
 #[pyfunction]
 #[pyo3(signature = (url, /))]
 fn resolve(_py: Python, url: &str) -> PyResult<PyDataset> {
-    let rt = tokio::runtime::Runtime::new().unwrap(); // create a runtime
+    let rt = pyo3_async_runtimes::tokio::get_runtime();
     let ds = rt
         .block_on(inner_resolve(url))
         .map_err(|err| PyRuntimeError::new_err(format!("{err}")))?;
     Ok(PyDataset(ds))
 }
 
+/// Number of crawled entries buffered ahead of the Python consumer, the crawl keeps running in
+/// the background until this many entries wait to be picked up.
+const CRAWL_PREFETCH: usize = 64;
+
+/// Upper bound of the buffer behind `crawl_batched`, large batch sizes must not turn into an
+/// unbounded (or, past `Semaphore::MAX_PERMITS`, panicking) prefetch.
+const CRAWL_BATCH_PREFETCH_MAX: usize = 4096;
+
 #[pyclass]
 struct PyEntryStream {
     stream: Arc<Mutex<BoxStream<'static, Result<Entry, Exn<CrawlerError>>>>>,
@@ -349,6 +447,8 @@ struct PyEntryStream {
 
 impl PyEntryStream {
     fn new(stream: BoxStream<'static, Result<Entry, Exn<CrawlerError>>>) -> Self {
+        let handle = pyo3_async_runtimes::tokio::get_runtime().handle();
+        let stream = prefetch(handle, stream, CRAWL_PREFETCH);
         PyEntryStream {
             stream: Arc::new(Mutex::new(stream)),
         }
@@ -362,12 +462,40 @@ struct PyFileMetaStream {
 
 impl PyFileMetaStream {
     fn new(stream: BoxStream<'static, Result<FileMeta, Exn<CrawlerError>>>) -> Self {
+        let handle = pyo3_async_runtimes::tokio::get_runtime().handle();
+        let stream = prefetch(handle, stream, CRAWL_PREFETCH);
         PyFileMetaStream {
             stream: Arc::new(Mutex::new(stream)),
         }
     }
 }
 
+/// Same as `PyEntryStream`, but hands entries over in lists of up to `batch_size`, so the
+/// GIL and the stream lock are taken once per batch instead of once per entry.
+#[pyclass]
+struct PyEntryBatchStream {
+    batches: Arc<Mutex<Batched<Entry, Exn<CrawlerError>>>>,
+    batch_size: usize,
+}
+
+impl PyEntryBatchStream {
+    fn new(
+        stream: BoxStream<'static, Result<Entry, Exn<CrawlerError>>>,
+        batch_size: usize,
+    ) -> Self {
+        let handle = pyo3_async_runtimes::tokio::get_runtime().handle();
+        let stream = prefetch(
+            handle,
+            stream,
+            batch_size.clamp(CRAWL_PREFETCH, CRAWL_BATCH_PREFETCH_MAX),
+        );
+        PyEntryBatchStream {
+            batches: Arc::new(Mutex::new(Batched::new(stream))),
+            batch_size: batch_size.max(1),
+        }
+    }
+}
+
 #[pyclass]
 #[pyo3(name = "Entry", subclass)]
 struct PyEntryBase;
@@ -380,42 +508,54 @@ impl PyEntryBase {
     }
 }
 
-#[pyclass]
+#[pyclass(get_all)]
 #[pyo3(name = "DirEntry", extends=PyEntryBase)]
 struct PyDirEntry {
-    #[pyo3(get)]
     path_crawl_rel: PathBuf,
-    #[pyo3(get)]
     root_url: String,
-    #[pyo3(get)]
     api_url: String,
 }
 
-#[pyclass]
+#[pyclass(get_all, set_all)]
 #[pyo3(name = "FileEntry", extends=PyEntryBase)]
 struct PyFileEntry {
-    #[pyo3(get, set)]
     filename: Option<String>,
-    #[pyo3(get, set)]
     file_identifier: Option<String>,
-    #[pyo3(get, set)]
     path_crawl_rel: PathBuf,
-    #[pyo3(get, set)]
     download_url: String,
-    #[pyo3(get, set)]
     size: Option<u64>,
-    #[pyo3(get, set)]
     checksum: Vec<(String, String)>,
-    #[pyo3(get, set)]
     mimetype: Option<String>,
-    #[pyo3(get, set)]
     version: Option<String>,
-    #[pyo3(get, set)]
     creation_date: Option<String>,
-    #[pyo3(get, set)]
     last_modification_date: Option<String>,
 }
 
+impl From<FileMeta> for PyFileEntry {
+    fn from(meta: FileMeta) -> Self {
+        PyFileEntry {
+            filename: meta.filename().map(|s| s.to_string()),
+            file_identifier: meta.file_identifier().map(|s| s.to_string()),
+            path_crawl_rel: PathBuf::from(meta.path().as_str()),
+            download_url: meta.download_url().as_str().to_string(),
+            size: meta.size(),
+            checksum: meta
+                .checksum()
+                .iter()
+                .map(|cs| match cs {
+                    datahugger::Checksum::Md5(v) => ("md5".to_string(), v.clone()),
+                    datahugger::Checksum::Sha256(v) => ("sha256".to_string(), v.clone()),
+                    datahugger::Checksum::Sha1(v) => ("sha1".to_string(), v.clone()),
+                })
+                .collect::<Vec<_>>(),
+            mimetype: meta.mimetype().map(|mime| mime.to_string()),
+            version: meta.version().map(|v| v.to_string()),
+            creation_date: meta.creation_date().map(|v| v.to_string()),
+            last_modification_date: meta.last_modification_date().map(|v| v.to_string()),
+        }
+    }
+}
+
 #[pymethods]
 impl PyFileEntry {
     #[allow(clippy::too_many_arguments)]
@@ -473,38 +613,9 @@ impl<'py> IntoPyObject<'py> for PyEntry {
             )
             .map(pyo3::Py::into_any)
             .expect("cannot construct the PyDirEntry"),
-            Entry::File(meta) => Py::new(
-                py,
-                (
-                    PyFileEntry {
-                        filename: meta.filename().map(|s| s.to_string()),
-                        file_identifier: meta.file_identifier().map(|s| s.to_string()),
-                        path_crawl_rel: PathBuf::from(meta.path().as_str()),
-                        download_url: meta.download_url().as_str().to_string(),
-                        size: meta.size(),
-                        checksum: meta
-                            .checksum()
-                            .iter()
-                            .map(|cs| match cs {
-                                datahugger::Checksum::Md5(v) => ("md5".to_string(), v.clone()),
-                                datahugger::Checksum::Sha256(v) => {
-                                    ("sha256".to_string(), v.clone())
-                                }
-                                datahugger::Checksum::Sha1(v) => ("sha1".to_string(), v.clone()),
-                            })
-                            .collect::<Vec<_>>(),
-                        mimetype: meta.mimetype().map(|mime| mime.to_string()),
-                        version: meta.version().map(|v| v.to_string()),
-                        creation_date: meta.creation_date().map(|v| v.to_string()),
-                        last_modification_date: meta
-                            .last_modification_date()
-                            .map(|v| v.to_string()),
-                    },
-                    PyEntryBase,
-                ),
-            )
-            .map(pyo3::Py::into_any)
-            .expect("cannot construct the PyDirEntry"),
+            Entry::File(meta) => Py::new(py, (PyFileEntry::from(meta), PyEntryBase))
+                .map(pyo3::Py::into_any)
+                .expect("cannot construct the PyDirEntry"),
         };
 
         Ok(obj.into_bound(py))
@@ -520,35 +631,9 @@ impl<'py> IntoPyObject<'py> for PyFileMeta {
     type Error = std::convert::Infallible;
 
     fn into_pyobject(self, py: Python<'py>) -> Result<Self::Output, Self::Error> {
-        let meta = self.0;
-        let obj = Py::new(
-            py,
-            (
-                PyFileEntry {
-                    filename: meta.filename().map(|s| s.to_string()),
-                    file_identifier: meta.file_identifier().map(|s| s.to_string()),
-                    path_crawl_rel: PathBuf::from(meta.path().as_str()),
-                    download_url: meta.download_url().as_str().to_string(),
-                    size: meta.size(),
-                    checksum: meta
-                        .checksum()
-                        .iter()
-                        .map(|cs| match cs {
-                            datahugger::Checksum::Md5(v) => ("md5".to_string(), v.clone()),
-                            datahugger::Checksum::Sha256(v) => ("sha256".to_string(), v.clone()),
-                            datahugger::Checksum::Sha1(v) => ("sha1".to_string(), v.clone()),
-                        })
-                        .collect::<Vec<_>>(),
-                    mimetype: meta.mimetype().map(|mime| mime.to_string()),
-                    version: meta.version().map(|v| v.to_string()),
-                    creation_date: meta.creation_date().map(|v| v.to_string()),
-                    last_modification_date: meta.last_modification_date().map(|v| v.to_string()),
-                },
-                PyEntryBase,
-            ),
-        )
-        .map(pyo3::Py::into_any)
-        .expect("cannot construct the PyDirEntry");
+        let obj = Py::new(py, (PyFileEntry::from(self.0), PyEntryBase))
+            .map(pyo3::Py::into_any)
+            .expect("cannot construct the PyDirEntry");
 
         Ok(obj.into_bound(py))
     }
@@ -579,6 +664,19 @@ impl PyEntryStream {
     }
 }
 
+// TODO: Errors mapping to py types as well and return the PyCrawrError.
+fn crawl_error(e: Exn<CrawlerError>) -> PyErr {
+    PyRuntimeError::new_err(format!("{e:?}"))
+}
+
+fn stream_exhausted(is_sync: bool) -> PyErr {
+    if is_sync {
+        PyStopIteration::new_err("stream exhausted")
+    } else {
+        PyStopAsyncIteration::new_err("stream exhausted")
+    }
+}
+
 async fn next_stream(
     stream: Arc<Mutex<BoxStream<'static, Result<Entry, Exn<CrawlerError>>>>>,
     is_sync: bool,
@@ -589,15 +687,8 @@ async fn next_stream(
             let py_entry = PyEntry(entry);
             Ok(py_entry)
         }
-        // TODO: Errors mapping to py types as well and return the PyCrawrError.
-        Some(Err(e)) => Err(PyRuntimeError::new_err(format!("{e:?}"))),
-        None => {
-            if is_sync {
-                Err(PyStopIteration::new_err("stream exhausted"))
-            } else {
-                Err(PyStopAsyncIteration::new_err("stream exhausted"))
-            }
-        }
+        Some(Err(e)) => Err(crawl_error(e)),
+        None => Err(stream_exhausted(is_sync)),
     }
 }
 
@@ -634,15 +725,51 @@ async fn next_stream_file(
             let frame = PyFileMeta(fm);
             Ok(frame)
         }
-        // TODO: Errors mapping to py types as well and return the PyCrawrError.
-        Some(Err(e)) => Err(PyRuntimeError::new_err(format!("{e:?}"))),
-        None => {
-            if is_sync {
-                Err(PyStopIteration::new_err("stream exhausted"))
-            } else {
-                Err(PyStopAsyncIteration::new_err("stream exhausted"))
-            }
-        }
+        Some(Err(e)) => Err(crawl_error(e)),
+        None => Err(stream_exhausted(is_sync)),
+    }
+}
+
+#[pymethods]
+impl PyEntryBatchStream {
+    fn __aiter__(slf: PyRef<Self>) -> PyRef<Self> {
+        slf
+    }
+
+    fn __iter__(slf: PyRef<Self>) -> PyRef<Self> {
+        slf
+    }
+
+    fn __anext__<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyAny>> {
+        let batches = self.batches.clone();
+
+        future_into_py(py, next_stream_batch(batches, self.batch_size, false))
+    }
+
+    fn __next__(&self, py: Python<'_>) -> PyResult<Vec<PyEntry>> {
+        let runtime = pyo3_async_runtimes::tokio::get_runtime();
+        let batches = self.batches.clone();
+        let batch_size = self.batch_size;
+        // the GIL is only needed to build the list, not while waiting on the crawl.
+        py.detach(|| runtime.block_on(next_stream_batch(batches, batch_size, true)))
+    }
+}
+
+async fn next_stream_batch(
+    batches: Arc<Mutex<Batched<Entry, Exn<CrawlerError>>>>,
+    batch_size: usize,
+    is_sync: bool,
+) -> PyResult<Vec<PyEntry>> {
+    let batch = batches
+        .lock()
+        .await
+        .next_batch(batch_size)
+        .await
+        .map_err(crawl_error)?;
+    if batch.is_empty() {
+        Err(stream_exhausted(is_sync))
+    } else {
+        Ok(batch.into_iter().map(PyEntry).collect())
     }
 }
 
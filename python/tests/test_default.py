@@ -54,6 +54,28 @@ def test_resolve_doi_blocking():
     ]
 
 
+@pytest.mark.asyncio
+async def test_resolve_doi_async():
+    doi_resolver = DOIResolver(timeout=30)
+
+    async def do_other_work():
+        for _ in range(5):
+            print("tick")
+            await asyncio.sleep(0.1)
+
+    urls, _ = await asyncio.gather(
+        doi_resolver.resolve_many_async(
+            ["10.34894/0B7ZLK", "10.17026/DANS-2AC-ETD6"], False
+        ),
+        do_other_work(),
+    )
+
+    assert urls == [
+        "https://dataverse.nl/citation?persistentId=doi:10.34894/0B7ZLK",
+        "https://phys-techsciences.datastations.nl/citation?persistentId=doi:10.17026/DANS-2AC-ETD6",
+    ]
+
+
 def test_download(tmp_path: Path) -> None:
     """real call to download, can be not stable. Since it is only for the non-recommended API,
     this test is acceptable.
@@ -99,12 +121,28 @@ def test_crawl_blocking():
     ds = resolve(
         "https://dataverse.harvard.edu/dataset.xhtml?persistentId=doi:10.7910/DVN/KBHLOD"
     )
+    entries = []
     for i in ds.crawl():
         print(i)
+        entries.append(i)
 
     for i in ds.crawl_file():
         print(i)
 
+    ds.refresh()
+    assert [i for i in ds.crawl()] == entries
+
+
+def test_crawl_batched():
+    ds = resolve(
+        "https://dataverse.harvard.edu/dataset.xhtml?persistentId=doi:10.7910/DVN/KBHLOD"
+    )
+    entries = [i for i in ds.crawl()]
+
+    batches = list(ds.crawl_batched(batch_size=2))
+    assert all(0 < len(batch) <= 2 for batch in batches)
+    assert [i for batch in batches for i in batch] == entries
+
 
 def test_dataverse_from_json():
     try:
@@ -1,9 +1,10 @@
 use exn::{Exn, ResultExt};
 use futures_core::stream::BoxStream;
+use futures_util::{stream::Fuse, FutureExt, StreamExt};
 use indicatif::{MultiProgress, ProgressBar, ProgressStyle};
 use reqwest::Client;
 
-use async_stream::try_stream;
+use async_stream::{stream, try_stream};
 use std::sync::Arc;
 
 use crate::{error::ErrorStatus, DatasetBackend, DirMeta, Entry};
@@ -91,3 +92,132 @@ where
         }
     })
 }
+
+/// Drives `stream` on a task spawned on `handle` and hands its items over through a channel
+/// holding up to `buffer` of them.
+///
+/// The stream keeps making progress (e.g. requesting the next listing pages) while the consumer
+/// is still busy with previous items, and items surface as soon as they are produced. The task
+/// stops when the stream is exhausted or when the returned stream is dropped.
+pub fn prefetch<T>(
+    handle: &tokio::runtime::Handle,
+    mut stream: BoxStream<'static, T>,
+    buffer: usize,
+) -> BoxStream<'static, T>
+where
+    T: Send + 'static,
+{
+    let (tx, mut rx) = tokio::sync::mpsc::channel(buffer.max(1));
+    handle.spawn(async move {
+        while let Some(item) = stream.next().await {
+            if tx.send(item).await.is_err() {
+                // receiver dropped, nobody is interested anymore.
+                break;
+            }
+        }
+    });
+    Box::pin(stream! {
+        while let Some(item) = rx.recv().await {
+            yield item;
+        }
+    })
+}
+
+/// Hands the items of a fallible stream over in batches, see [`Batched::next_batch`].
+pub struct Batched<T, E> {
+    // fused, so that asking again after the end keeps returning an empty batch.
+    stream: Fuse<BoxStream<'static, Result<T, E>>>,
+    // an error met after items were already batched, returned by the next call.
+    pending_err: Option<E>,
+}
+
+impl<T, E> Batched<T, E> {
+    #[must_use]
+    pub fn new(stream: BoxStream<'static, Result<T, E>>) -> Self {
+        Batched {
+            stream: stream.fuse(),
+            pending_err: None,
+        }
+    }
+
+    /// Waits for the next item, then takes the ones the stream already has ready, up to
+    /// `batch_size` (at least one) in total. Returns an empty batch once the stream is exhausted.
+    ///
+    /// # Errors
+    ///
+    /// Returns the error of the stream. An error met after some items were taken is held back
+    /// and returned by the next call instead, so that the items are not lost.
+    pub async fn next_batch(&mut self, batch_size: usize) -> Result<Vec<T>, E> {
+        if let Some(err) = self.pending_err.take() {
+            return Err(err);
+        }
+        let mut batch = Vec::new();
+        while batch.len() < batch_size.max(1) {
+            let next = if batch.is_empty() {
+                self.stream.next().await
+            } else {
+                match self.stream.next().now_or_never() {
+                    Some(next) => next,
+                    None => break,
+                }
+            };
+            match next {
+                Some(Ok(item)) => batch.push(item),
+                Some(Err(err)) if batch.is_empty() => return Err(err),
+                Some(Err(err)) => {
+                    self.pending_err = Some(err);
+                    break;
+                }
+                None => break,
+            }
+        }
+        Ok(batch)
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[tokio::test]
+    async fn test_batched_keeps_items_before_error() {
+        let src = futures_util::stream::iter([Ok(1), Ok(2), Ok(3), Err("boom"), Ok(4)]).boxed();
+        let mut batches = Batched::new(src);
+
+        assert_eq!(batches.next_batch(2).await, Ok(vec![1, 2]));
+        // the error is held back until the entries before it are handed over
+        assert_eq!(batches.next_batch(8).await, Ok(vec![3]));
+        assert_eq!(batches.next_batch(8).await, Err("boom"));
+        assert_eq!(batches.next_batch(8).await, Ok(vec![4]));
+        assert_eq!(batches.next_batch(8).await, Ok(vec![]));
+    }
+
+    #[tokio::test]
+    async fn test_batched_does_not_wait_for_full_batch() {
+        let (tx, rx) = tokio::sync::mpsc::unbounded_channel::<Result<u8, ()>>();
+        let src = Box::pin(stream! {
+            let mut rx = rx;
+            while let Some(item) = rx.recv().await {
+                yield item;
+            }
+        });
+        let mut batches = Batched::new(src);
+
+        tx.send(Ok(1)).unwrap();
+        tx.send(Ok(2)).unwrap();
+        assert_eq!(batches.next_batch(8).await, Ok(vec![1, 2]));
+        tx.send(Ok(3)).unwrap();
+        drop(tx);
+        assert_eq!(batches.next_batch(8).await, Ok(vec![3]));
+        assert_eq!(batches.next_batch(8).await, Ok(vec![]));
+    }
+
+    #[tokio::test]
+    async fn test_prefetch_keep_order() {
+        let src = futures_util::stream::iter(0..100).boxed();
+        let items = prefetch(&tokio::runtime::Handle::current(), src, 8)
+            .collect::<Vec<_>>()
+            .await;
+        assert_eq!(items, (0..100).collect::<Vec<_>>());
+    }
+}
@@ -2,6 +2,7 @@
 
 use async_trait::async_trait;
 use exn::{Exn, ResultExt};
+use serde::Deserialize;
 use serde_json::Value as JsonValue;
 use url::Url;
 
@@ -34,89 +35,88 @@ fn parse_url(base_url: Url, version: &str, id: &str) -> Url {
     url
 }
 
-fn analyse_json(json: &JsonValue, dir: &DirMeta) -> Result<Vec<Entry>, Exn<RepoError>> {
-    let files = json
-        .get("data")
-        .and_then(|d| d.get("files"))
-        .and_then(JsonValue::as_array)
-        .ok_or_else(|| RepoError {
-            message: "field with key 'data.files' not resolve to an json array".to_string(),
+// The part of the dataset version response that is used to list the files,
+// deserialized in one pass instead of walking a `serde_json::Value` per field.
+#[derive(Debug, Deserialize)]
+struct DatasetVersionResponse {
+    data: DatasetVersion,
+}
+
+#[derive(Debug, Deserialize)]
+struct DatasetVersion {
+    files: Vec<DatasetFile>,
+}
+
+#[derive(Debug, Deserialize)]
+#[serde(rename_all = "camelCase")]
+struct DatasetFile {
+    restricted: bool,
+    version: u64,
+    #[serde(default)]
+    directory_label: Option<String>,
+    data_file: DataFile,
+}
+
+#[derive(Debug, Deserialize)]
+#[serde(rename_all = "camelCase")]
+struct DataFile {
+    id: u64,
+    filename: String,
+    filesize: u64,
+    content_type: String,
+    creation_date: String,
+    #[serde(default)]
+    last_update_time: Option<String>,
+    checksum: DataFileChecksum,
+}
+
+#[derive(Debug, Deserialize)]
+struct DataFileChecksum {
+    #[serde(rename = "type")]
+    typ: String,
+    value: String,
+}
+
+fn analyse_json(json: DatasetVersionResponse, dir: &DirMeta) -> Result<Vec<Entry>, Exn<RepoError>> {
+    let files = json.data.files;
+    let download_base = dir
+        .api_url()
+        .join("/api/access/datafile/")
+        .or_raise(|| RepoError {
+            message: "cannot parse download base url".to_string(),
         })?;
 
     let mut entries = Vec::with_capacity(files.len());
-    for (idx, filej) in files.iter().enumerate() {
+    for (idx, filej) in files.into_iter().enumerate() {
         let endpoint = Endpoint {
             parent_url: dir.api_url().clone(),
             key: Some(format!("data.files.{idx}")),
         };
-        let name: String = json_extract(filej, "dataFile.filename").or_raise(|| RepoError {
-            message: "fail to extracting 'dataFile.filename' as String from json".to_string(),
-        })?;
-        let restricted: bool = json_extract(filej, "restricted").or_raise(|| RepoError {
-            message: "fail to extracting 'dataFile.filename' as String from json".to_string(),
-        })?;
-        let downloadable = !restricted;
-        let id: u64 = json_extract(filej, "dataFile.id").or_raise(|| RepoError {
-            message: "fail to extracting 'dataFile.id' as u64 from json".to_string(),
-        })?;
-        let size: u64 = json_extract(filej, "dataFile.filesize").or_raise(|| RepoError {
-            message: "fail to extracting 'dataFile.filesize' as u64 from json".to_string(),
-        })?;
-        let creation_date: String =
-            json_extract(filej, "dataFile.creationDate").or_raise(|| RepoError {
-                message: "fail to extracting 'dataFile.creationDate' as String from json"
-                    .to_string(),
-            })?;
-        let last_modification_date: Option<String> =
-            json_extract(filej, "dataFile.lastUpdateTime").ok();
-        let mime_type: String =
-            json_extract(filej, "dataFile.contentType").or_raise(|| RepoError {
-                message: "fail to extracting 'dataFile.contentType' as String from json"
-                    .to_string(),
-            })?;
+        let DataFile {
+            id,
+            filename: name,
+            filesize: size,
+            content_type: mime_type,
+            creation_date,
+            last_update_time: last_modification_date,
+            checksum,
+        } = filej.data_file;
+        let downloadable = !filej.restricted;
         let mime_type = mime::Mime::from_str(&mime_type).or_raise(|| RepoError {
             message: format!("fail to parse the '{}' to proper mime type", mime_type),
         })?;
 
-        let version: u64 = json_extract(filej, "version").or_raise(|| RepoError {
-            message: "fail to extracting 'version' as u64 from json".to_string(),
-        })?;
-
-        let download_url = dir
-            .api_url()
-            .join("/api/access/datafile/")
-            .or_raise(|| RepoError {
-                message: "cannot parse download base url".to_string(),
-            })?;
-        let download_url = download_url.join(&format!("{id}")).or_raise(|| RepoError {
-            message: format!("cannot parse '{download_url}' download url"),
+        let id = id.to_string();
+        let download_url = download_base.join(&id).or_raise(|| RepoError {
+            message: format!("cannot parse '{download_base}{id}' download url"),
         })?;
-        let dst_path = match json_extract::<String>(filej, "directoryLabel") {
-            Ok(dir_label) => dir.join(&format!("{dir_label}/{name}")),
-            Err(_) => dir.join(&name),
+        let dst_path = match filej.directory_label {
+            Some(dir_label) => dir.join(&format!("{dir_label}/{name}")),
+            None => dir.join(&name),
         };
-        let checksum_typ: String =
-            json_extract(filej, "dataFile.checksum.type").or_raise(|| RepoError {
-                message: "fail to extracting 'dataFile.checksum.type' as String from json"
-                    .to_string(),
-            })?;
-        let checksum = match checksum_typ.as_str() {
-            "MD5" | "md5" => {
-                let hash: String =
-                    json_extract(filej, "dataFile.checksum.value").or_raise(|| RepoError {
-                        message: "fail to extracting 'dataFile.checksum.value' as String from json"
-                            .to_string(),
-                    })?;
-                Checksum::Md5(hash)
-            }
-            "SHA-1" | "sha-1" => {
-                let hash: String =
-                    json_extract(filej, "dataFile.checksum.value").or_raise(|| RepoError {
-                        message: "fail to extracting 'dataFile.checksum.value' as String from json"
-                            .to_string(),
-                    })?;
-                Checksum::Sha1(hash)
-            }
+        let checksum = match checksum.typ.as_str() {
+            "MD5" | "md5" => Checksum::Md5(checksum.value),
+            "SHA-1" | "sha-1" => Checksum::Sha1(checksum.value),
             v => {
                 exn::bail!(RepoError {
                     message: format!(
@@ -127,14 +127,14 @@ fn analyse_json(json: &JsonValue, dir: &DirMeta) -> Result<Vec<Entry>, Exn<RepoE
         };
         let file = FileMeta::new(
             Some(name),
-            Some(id.to_string()),
+            Some(id),
             dst_path,
             endpoint,
             download_url,
             Some(size),
             vec![checksum],
             Some(mime_type),
-            Some(version.to_string()),
+            Some(filej.version.to_string()),
             Some(creation_date),
             last_modification_date,
             downloadable,
@@ -193,11 +193,14 @@ impl DatasetBackend for DataverseDataset {
                 message: format!("fail GET {}, network / protocol error", dir.api_url(),),
             },
         })?;
-        let resp: JsonValue = resp.json().await.or_raise(|| RepoError {
-            message: format!("fail GET {}, unable to convert to json", dir.api_url(),),
+        let resp: DatasetVersionResponse = resp.json().await.or_raise(|| RepoError {
+            message: format!(
+                "fail GET {}, unable to parse the dataset version json",
+                dir.api_url(),
+            ),
         })?;
 
-        let entries = analyse_json(&resp, &dir)?;
+        let entries = analyse_json(resp, &dir)?;
 
         Ok(entries)
     }
@@ -235,11 +238,12 @@ impl DataverseJsonSrcDataset {
 #[async_trait]
 impl DatasetBackend for DataverseJsonSrcDataset {
     async fn list(&self, _client: &Client, dir: DirMeta) -> Result<Vec<Entry>, Exn<RepoError>> {
-        let json_value: JsonValue = serde_json::from_str(self.content).or_raise(|| RepoError {
-            message: "Failed to parse JSON".to_string(),
-        })?;
+        let json_value: DatasetVersionResponse =
+            serde_json::from_str(self.content).or_raise(|| RepoError {
+                message: "Failed to parse JSON".to_string(),
+            })?;
 
-        let entries = analyse_json(&json_value, &dir)?;
+        let entries = analyse_json(json_value, &dir)?;
 
         Ok(entries)
     }
@@ -96,8 +96,9 @@ where
         };
     }
 
-    // Path exists, try to deserialize - error if wrong type
-    let value: T = serde_json::from_value::<T>(current.clone()).or_raise(|| JsonExtractError {
+    // Path exists, try to deserialize - error if wrong type.
+    // `&Value` is a deserializer itself, so the subtree is read in place rather than cloned.
+    let value: T = T::deserialize(current).or_raise(|| JsonExtractError {
         message: format!("failed to deserialize value at path '{path}'"),
         status: ErrorStatus::Permanent,
     })?;
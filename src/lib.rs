@@ -15,6 +15,8 @@ mod helper;
 mod resolver;
 pub use crate::resolver::resolve;
 pub use crate::resolver::resolve_doi_to_url;
+pub use crate::resolver::resolve_dois_to_urls;
+pub use crate::resolver::DoiCache;
 
 pub mod crawler;
 pub use crawler::crawl;
@@ -1,24 +1,34 @@
+use async_stream::try_stream;
 use async_trait::async_trait;
 use exn::{Exn, OptionExt, ResultExt};
 use futures_core::stream::BoxStream;
 use futures_util::{StreamExt, TryStreamExt};
 use indicatif::{MultiProgress, ProgressBar, ProgressStyle};
-use std::sync::Arc;
+use std::sync::{Arc, LazyLock};
 
-use reqwest::Client;
+use reqwest::{
+    header::{CONTENT_RANGE, RANGE},
+    Client, Response, StatusCode,
+};
 
 use crate::{
     crawl,
-    crawler::{CrawlerError, ProgressManager},
+    crawler::{prefetch, CrawlerError, ProgressManager},
     error::ErrorStatus,
     Dataset, Entry,
 };
 
-use bytes::Buf;
+use bytes::{Bytes, BytesMut};
 use digest::Digest;
 use std::{fs, path::Path};
-use tokio::{fs::OpenOptions, io::AsyncWriteExt};
+use tokio::{
+    fs::OpenOptions,
+    io::{AsyncWriteExt, BufWriter},
+    runtime::Handle,
+    sync::{OwnedSemaphorePermit, Semaphore},
+};
 use tracing::{debug, instrument, warn};
+use url::Url;
 
 use crate::{Checksum, Hasher};
 
@@ -97,22 +107,12 @@ where
                 return Ok(());
             }
 
-            let resp = client
-                .get(file_meta.download_url())
-                .send()
-                .await
-                .or_raise(|| CrawlerError {
-                    message: format!("fail to send http GET to {}", file_meta.download_url()),
-                    status: ErrorStatus::Temporary,
-                })?
-                .error_for_status()
-                .or_raise(|| CrawlerError {
-                    message: format!("fail to send http GET to {}", file_meta.download_url()),
-                    // Temporary??
-                    status: ErrorStatus::Temporary,
-                })?;
+            let range_chunk_size = file_meta
+                .size()
+                .is_some_and(|size| size >= RANGED_DOWNLOAD_MIN_SIZE)
+                .then_some(RANGE_CHUNK_SIZE);
+            let resp = request_file(client, &file_meta.download_url(), range_chunk_size).await?;
             pb.finish_and_clear();
-            let mut stream = resp.bytes_stream();
             // prepare file dst
             // NOTE: like in zenodo, the file path can exist without its parent dir as Dir entity
             // being created first. To cover that case, the folder of the path will be created no
@@ -127,16 +127,6 @@ where
                 message: format!("connot create folder dir of '{}'", parent_dir.display()),
                 status: ErrorStatus::Permanent,
             })?;
-            let mut fh = OpenOptions::new()
-                .write(true)
-                .create(true)
-                .truncate(true)
-                .open(path.as_path())
-                .await
-                .or_raise(|| CrawlerError {
-                    message: format!("fail on create file at {}", path.display()),
-                    status: ErrorStatus::Permanent,
-                })?;
 
             let checksum = file_meta
                 .checksum()
@@ -173,26 +163,16 @@ where
             pb.enable_steady_tick(std::time::Duration::from_millis(100));
             pb.set_message(compact_path(file_meta.relative().as_str()));
 
-            let mut got_size = 0;
-            while let Some(item) = stream.next().await {
-                let mut bytes = item.or_raise(|| CrawlerError {
-                    message: "reqwest error stream".to_string(),
-                    status: ErrorStatus::Permanent,
-                })?;
-                let chunk = bytes.chunk();
-                if let Some(ref mut hasher) = hasher {
-                    hasher.update(chunk);
-                }
-                let bytes_len = bytes.len() as u64;
-                got_size += bytes_len;
-                fh.write_all_buf(&mut bytes)
-                    .await
-                    .or_raise(|| CrawlerError {
-                        message: "fail at writing to fs".to_string(),
-                        status: ErrorStatus::Permanent,
-                    })?;
-                pb.inc(bytes_len);
-            }
+            let got_size = write_response(
+                client,
+                resp,
+                &path,
+                expected_size,
+                range_chunk_size,
+                &mut hasher,
+                &pb,
+            )
+            .await?;
 
             pb.finish_and_clear();
 
@@ -206,12 +186,13 @@ where
                     })
                 }
 
-                let checksum = hex::encode(hasher.expect("hasher is not none").finalize());
+                let digest = hasher.expect("hasher is not none").finalize();
 
-                if checksum != *expected_checksum {
+                if !digest_matches(&digest, expected_checksum) {
                     exn::bail!(CrawlerError {
                         message: format!(
-                            "checksum wrong, expect {expected_checksum}, got {checksum}"
+                            "checksum wrong, expect {expected_checksum}, got {}",
+                            hex::encode(&digest)
                         ),
                         status: ErrorStatus::Permanent
                     })
@@ -222,6 +203,388 @@ where
     }
 }
 
+/// Number of crawled entries buffered ahead of the downloads.
+const CRAWL_PREFETCH: usize = 64;
+
+/// Files with a known size up to this limit are buffered in memory and written to disk
+/// with a single blocking call, instead of paying one thread-pool hop per received chunk.
+const BUFFERED_WRITE_LIMIT: u64 = 1024 * 1024;
+
+/// Bytes of file content held in memory at once, over all concurrent downloads, shared by
+/// buffered writes and in-flight range requests.
+const DOWNLOAD_MEMORY_BUDGET: usize = 64 * 1024 * 1024;
+
+// downloads are unbounded by default (`limit = 0`), so the bytes they buffer share one budget.
+static DOWNLOAD_MEMORY: LazyLock<Arc<Semaphore>> =
+    LazyLock::new(|| Arc::new(Semaphore::new(DOWNLOAD_MEMORY_BUDGET)));
+
+/// Capacity of the write buffer used when streaming larger files to disk.
+const STREAM_WRITE_BUFFER_SIZE: usize = 1024 * 1024;
+
+/// Sends the GET for `url`. With `range_chunk_size`, only the first range of that size is
+/// asked for, a server answering with 206 tells the rest of the file can be fetched in parallel.
+async fn request_file(
+    client: &Client,
+    url: &Url,
+    range_chunk_size: Option<u64>,
+) -> Result<Response, Exn<CrawlerError>> {
+    let mut req = client.get(url.clone());
+    if let Some(chunk_size) = range_chunk_size {
+        req = req.header(RANGE, format!("bytes=0-{}", chunk_size - 1));
+    }
+    req.send()
+        .await
+        .or_raise(|| CrawlerError {
+            message: format!("fail to send http GET to {url}"),
+            status: ErrorStatus::Temporary,
+        })?
+        .error_for_status()
+        .or_raise(|| CrawlerError {
+            message: format!("fail to send http GET to {url}"),
+            // Temporary??
+            status: ErrorStatus::Temporary,
+        })
+}
+
+/// Writes the file answered by `resp` to `path`, picking how from its status and `size`,
+/// returns the number of bytes written.
+async fn write_response(
+    client: &Client,
+    resp: Response,
+    path: &Path,
+    size: Option<u64>,
+    range_chunk_size: Option<u64>,
+    hasher: &mut Option<Hasher>,
+    pb: &ProgressBar,
+) -> Result<u64, Exn<CrawlerError>> {
+    match (size, range_chunk_size) {
+        (Some(size), Some(chunk_size)) if resp.status() == StatusCode::PARTIAL_CONTENT => {
+            write_ranged(client, resp, path, size, chunk_size, hasher, pb).await
+        }
+        (Some(size), _) if size <= BUFFERED_WRITE_LIMIT => {
+            // the file is streamed instead if the budget is used up by other downloads.
+            match u32::try_from(size)
+                .ok()
+                .and_then(|n| Arc::clone(&DOWNLOAD_MEMORY).try_acquire_many_owned(n).ok())
+            {
+                Some(permit) => write_buffered(resp, path, size, permit, hasher, pb).await,
+                None => write_streamed(resp, path, Bytes::new(), hasher, pb).await,
+            }
+        }
+        _ => write_streamed(resp, path, Bytes::new(), hasher, pb).await,
+    }
+}
+
+/// Reads the whole body of `resp` into memory and writes it to `path` at once,
+/// returns the number of bytes received. `_permit` holds `size` bytes of the memory budget,
+/// a body larger than `size` is streamed to disk instead of growing the buffer past it.
+async fn write_buffered(
+    mut resp: Response,
+    path: &Path,
+    size: u64,
+    _permit: OwnedSemaphorePermit,
+    hasher: &mut Option<Hasher>,
+    pb: &ProgressBar,
+) -> Result<u64, Exn<CrawlerError>> {
+    let mut buf = BytesMut::with_capacity(usize::try_from(size).unwrap_or_default());
+    while let Some(bytes) = resp.chunk().await.or_raise(|| CrawlerError {
+        message: "reqwest error stream".to_string(),
+        status: ErrorStatus::Permanent,
+    })? {
+        pb.inc(bytes.len() as u64);
+        if (buf.len() + bytes.len()) as u64 > size {
+            buf.extend_from_slice(&bytes);
+            return write_streamed(resp, path, buf.freeze(), hasher, pb).await;
+        }
+        buf.extend_from_slice(&bytes);
+    }
+
+    let got_size = buf.len() as u64;
+    let buf = buf.freeze();
+    let dst = path.to_path_buf();
+    // the digest is computed in the same blocking task, right before the write.
+    let mut h = hasher.take();
+    *hasher = tokio::task::spawn_blocking(move || {
+        if let Some(h) = h.as_mut() {
+            h.update(&buf);
+        }
+        fs::write(dst, &buf).map(|()| h)
+    })
+    .await
+    .or_raise(|| CrawlerError {
+        message: format!("writing task of '{}' did not complete", path.display()),
+        status: ErrorStatus::Permanent,
+    })?
+    .or_raise(|| CrawlerError {
+        message: format!("fail at writing to '{}'", path.display()),
+        status: ErrorStatus::Permanent,
+    })?;
+    Ok(got_size)
+}
+
+/// Streams the body of `resp` to `path` through a large write buffer, after the already
+/// received `head` of the file, returns the number of bytes written.
+async fn write_streamed(
+    mut resp: Response,
+    path: &Path,
+    head: Bytes,
+    hasher: &mut Option<Hasher>,
+    pb: &ProgressBar,
+) -> Result<u64, Exn<CrawlerError>> {
+    let fh = OpenOptions::new()
+        .write(true)
+        .create(true)
+        .truncate(true)
+        .open(path)
+        .await
+        .or_raise(|| CrawlerError {
+            message: format!("fail on create file at {}", path.display()),
+            status: ErrorStatus::Permanent,
+        })?;
+    let mut fh = BufWriter::with_capacity(STREAM_WRITE_BUFFER_SIZE, fh);
+
+    if let Some(hasher) = hasher.as_mut() {
+        hasher.update(&head);
+    }
+    fh.write_all(&head).await.or_raise(|| CrawlerError {
+        message: "fail at writing to fs".to_string(),
+        status: ErrorStatus::Permanent,
+    })?;
+    let mut got_size = head.len() as u64;
+    while let Some(bytes) = resp.chunk().await.or_raise(|| CrawlerError {
+        message: "reqwest error stream".to_string(),
+        status: ErrorStatus::Permanent,
+    })? {
+        if let Some(hasher) = hasher.as_mut() {
+            hasher.update(&bytes);
+        }
+        fh.write_all(&bytes).await.or_raise(|| CrawlerError {
+            message: "fail at writing to fs".to_string(),
+            status: ErrorStatus::Permanent,
+        })?;
+        let bytes_len = bytes.len() as u64;
+        got_size += bytes_len;
+        pb.inc(bytes_len);
+    }
+    fh.flush().await.or_raise(|| CrawlerError {
+        message: format!("fail at flushing '{}'", path.display()),
+        status: ErrorStatus::Permanent,
+    })?;
+    Ok(got_size)
+}
+
+/// Files with a known size from this limit on are fetched with parallel range requests,
+/// if the server supports them.
+const RANGED_DOWNLOAD_MIN_SIZE: u64 = 64 * 1024 * 1024;
+
+/// Number of bytes fetched by each range request.
+const RANGE_CHUNK_SIZE: u64 = 4 * 1024 * 1024;
+
+/// Maximum number of range requests in flight for a single file.
+const RANGE_CONCURRENCY: usize = 8;
+
+/// Waits until `len` bytes of the download memory budget are free and holds them.
+async fn reserve_memory(len: u64) -> OwnedSemaphorePermit {
+    let len = u32::try_from(len).expect("a range fits in the memory budget");
+    Arc::clone(&DOWNLOAD_MEMORY)
+        .acquire_many_owned(len)
+        .await
+        .expect("the memory budget is never closed")
+}
+
+/// Downloads a file of `size` bytes to `path` with parallel range requests of `chunk_size`
+/// bytes, `first` is the partial content response of the first range.
+/// Returns the number of bytes written.
+async fn write_ranged(
+    client: &Client,
+    first: Response,
+    path: &Path,
+    size: u64,
+    chunk_size: u64,
+    hasher: &mut Option<Hasher>,
+    pb: &ProgressBar,
+) -> Result<u64, Exn<CrawlerError>> {
+    // the server tells the total size, check it before allocating the file to the metadata size.
+    let first_end = chunk_size.min(size) - 1;
+    let content_range = first
+        .headers()
+        .get(CONTENT_RANGE)
+        .and_then(|value| value.to_str().ok())
+        .and_then(parse_content_range);
+    match content_range {
+        Some((0, end, total)) if end == first_end && total == size => {}
+        Some((_, _, total)) if total != size => exn::bail!(CrawlerError {
+            message: format!("size wrong, expect {size}, server reports {total}"),
+            status: ErrorStatus::Permanent
+        }),
+        _ => exn::bail!(CrawlerError {
+            message: format!(
+                "expect 'Content-Range: bytes 0-{first_end}/{size}' for the first range"
+            ),
+            status: ErrorStatus::Temporary
+        }),
+    }
+
+    // the other ranges go to where the first one landed, skipping the redirects.
+    let url = first.url().clone();
+    let fh = fs::File::create(path).or_raise(|| CrawlerError {
+        message: format!("fail on create file at {}", path.display()),
+        status: ErrorStatus::Permanent,
+    })?;
+    fh.set_len(size).or_raise(|| CrawlerError {
+        message: format!("fail on allocating {size} bytes for {}", path.display()),
+        status: ErrorStatus::Permanent,
+    })?;
+    let fh = Arc::new(fh);
+
+    let permit = reserve_memory(first_end + 1).await;
+    let bytes = read_range(first, 0, first_end).await?;
+    let mut got_size = bytes.len() as u64;
+    write_range(&fh, bytes, 0, hasher, pb).await?;
+    drop(permit);
+
+    // ranges are fetched concurrently but yielded in file order, so the checksum
+    // is updated as they land without reading the file back. Their memory is reserved in
+    // file order too, the range written next always holds its share of the budget.
+    let mut ranges = std::pin::pin!(futures_util::stream::iter(
+        (chunk_size..size).step_by(usize::try_from(chunk_size).unwrap_or(usize::MAX)),
+    )
+    .then(|start| async move {
+        let end = (start + chunk_size).min(size) - 1;
+        (start, end, reserve_memory(end - start + 1).await)
+    })
+    .map(|(start, end, permit)| {
+        let req = client
+            .get(url.clone())
+            .header(RANGE, format!("bytes={start}-{end}"));
+        async move {
+            let resp = req
+                .send()
+                .await
+                .or_raise(|| CrawlerError {
+                    message: format!("fail to send http GET for bytes {start}-{end}"),
+                    status: ErrorStatus::Temporary,
+                })?
+                .error_for_status()
+                .or_raise(|| CrawlerError {
+                    message: format!("fail to send http GET for bytes {start}-{end}"),
+                    status: ErrorStatus::Temporary,
+                })?;
+            read_range(resp, start, end)
+                .await
+                .map(|bytes| (start, bytes, permit))
+        }
+    })
+    .buffered(RANGE_CONCURRENCY));
+    while let Some((start, bytes, _permit)) = ranges.try_next().await? {
+        got_size += bytes.len() as u64;
+        write_range(&fh, bytes, start, hasher, pb).await?;
+    }
+    Ok(got_size)
+}
+
+/// Parses a `Content-Range` value of the form `bytes <start>-<end>/<total>`.
+fn parse_content_range(value: &str) -> Option<(u64, u64, u64)> {
+    let (range, total) = value.strip_prefix("bytes ")?.split_once('/')?;
+    let (start, end) = range.split_once('-')?;
+    Some((
+        start.trim().parse().ok()?,
+        end.trim().parse().ok()?,
+        total.trim().parse().ok()?,
+    ))
+}
+
+/// Reads the body of `resp`, which must hold exactly bytes `start..=end` of the file.
+async fn read_range(resp: Response, start: u64, end: u64) -> Result<Bytes, Exn<CrawlerError>> {
+    if resp.status() != StatusCode::PARTIAL_CONTENT {
+        exn::bail!(CrawlerError {
+            message: format!(
+                "expect partial content for bytes {start}-{end}, got {}",
+                resp.status()
+            ),
+            status: ErrorStatus::Temporary
+        })
+    }
+    let bytes = resp.bytes().await.or_raise(|| CrawlerError {
+        message: "reqwest error stream".to_string(),
+        status: ErrorStatus::Permanent,
+    })?;
+    if bytes.len() as u64 != end - start + 1 {
+        exn::bail!(CrawlerError {
+            message: format!(
+                "size wrong for bytes {start}-{end}, expect {}, got {}",
+                end - start + 1,
+                bytes.len()
+            ),
+            status: ErrorStatus::Temporary
+        })
+    }
+    Ok(bytes)
+}
+
+/// Hashes `bytes` and writes them at offset `start` of `fh`, in one blocking task.
+async fn write_range(
+    fh: &Arc<fs::File>,
+    bytes: Bytes,
+    start: u64,
+    hasher: &mut Option<Hasher>,
+    pb: &ProgressBar,
+) -> Result<(), Exn<CrawlerError>> {
+    let bytes_len = bytes.len() as u64;
+    let fh = Arc::clone(fh);
+    let mut h = hasher.take();
+    *hasher = tokio::task::spawn_blocking(move || {
+        if let Some(h) = h.as_mut() {
+            h.update(&bytes);
+        }
+        write_all_at(&fh, &bytes, start).map(|()| h)
+    })
+    .await
+    .or_raise(|| CrawlerError {
+        message: format!("writing task of bytes at {start} did not complete"),
+        status: ErrorStatus::Permanent,
+    })?
+    .or_raise(|| CrawlerError {
+        message: format!("fail at writing bytes at {start} to fs"),
+        status: ErrorStatus::Permanent,
+    })?;
+    pb.inc(bytes_len);
+    Ok(())
+}
+
+#[cfg(unix)]
+fn write_all_at(fh: &fs::File, buf: &[u8], offset: u64) -> std::io::Result<()> {
+    use std::os::unix::fs::FileExt;
+    fh.write_all_at(buf, offset)
+}
+
+#[cfg(windows)]
+fn write_all_at(fh: &fs::File, mut buf: &[u8], mut offset: u64) -> std::io::Result<()> {
+    use std::os::windows::fs::FileExt;
+    while !buf.is_empty() {
+        let n = fh.seek_write(buf, offset)?;
+        if n == 0 {
+            return Err(std::io::ErrorKind::WriteZero.into());
+        }
+        buf = &buf[n..];
+        offset += n as u64;
+    }
+    Ok(())
+}
+
+/// Compares a computed `digest` with the hex encoded checksum from the repository metadata.
+///
+/// The expected value is decoded into a stack buffer and compared byte-wise, rather than
+/// hex-encoding every digest. Decoding is case-insensitive.
+fn digest_matches(digest: &[u8], expected_hex: &str) -> bool {
+    // large enough for any digest `Hasher` produces (sha256 is the longest at 32 bytes).
+    let mut buf = [0u8; 64];
+    let Some(expected) = buf.get_mut(..digest.len()) else {
+        return false;
+    };
+    hex::decode_to_slice(expected_hex.trim(), expected).is_ok() && *expected == *digest
+}
+
 fn compact_path(full_path: &str) -> String {
     let path = Path::new(full_path);
 
@@ -285,7 +648,8 @@ impl DownloadExt for Dataset {
     /// # Concurrency
     ///
     /// Downloads are performed concurrently with a fixed upper limit to avoid overwhelming
-    /// the network or filesystem.
+    /// the network or filesystem. Large files are in addition fetched as parallel byte ranges
+    /// when the server supports range requests.
     ///
     /// # Errors
     ///
@@ -316,27 +680,30 @@ impl DownloadExt for Dataset {
             message: format!("cannot create dir at '{}'", path.display()),
             status: ErrorStatus::Permanent,
         })?;
-        crawl(
+        let entries = crawl(
             client.clone(),
             Arc::clone(&self.backend),
             root_dir,
             mp.clone(),
-        )
-        // NOTE: limit set to 0 as default for cli download,
-        // should set to 20 for polite crawling for every dataset, it limit the stream consumer rate.
-        .try_for_each_concurrent(limit, |entry| {
-            let dst_dir = dst_dir.as_ref().to_path_buf();
-            let mp = mp.clone();
-            async move {
-                download_crawled_file_with_validation(client, entry, &dst_dir, mp).await?;
-                Ok(())
-            }
-        })
-        .await
-        .or_raise(|| CrawlerError {
-            message: "crawl, download and validation failed".to_string(),
-            status: ErrorStatus::Permanent,
-        })?;
+        );
+        // crawl keeps listing further pages while all download slots are busy, so that
+        // pagination overlaps with transfers instead of waiting for a free slot.
+        prefetch(&Handle::current(), entries, CRAWL_PREFETCH)
+            // NOTE: limit set to 0 as default for cli download,
+            // should set to 20 for polite crawling for every dataset, it limit the stream consumer rate.
+            .try_for_each_concurrent(limit, |entry| {
+                let dst_dir = dst_dir.as_ref().to_path_buf();
+                let mp = mp.clone();
+                async move {
+                    download_crawled_file_with_validation(client, entry, &dst_dir, mp).await?;
+                    Ok(())
+                }
+            })
+            .await
+            .or_raise(|| CrawlerError {
+                message: "crawl, download and validation failed".to_string(),
+                status: ErrorStatus::Permanent,
+            })?;
         Ok(())
     }
 }
@@ -347,6 +714,12 @@ pub trait CrawlExt {
         client: &Client,
         mp: impl ProgressManager,
     ) -> BoxStream<'static, Result<Entry, Exn<CrawlerError>>>;
+
+    fn crawl_cached(
+        self,
+        client: &Client,
+        mp: impl ProgressManager,
+    ) -> BoxStream<'static, Result<Entry, Exn<CrawlerError>>>;
 }
 
 impl CrawlExt for Dataset {
@@ -363,4 +736,354 @@ impl CrawlExt for Dataset {
             mp.clone(),
         )
     }
+
+    /// Same as [`CrawlExt::crawl`], but replays the entries of the last complete crawl.
+    ///
+    /// A crawl that runs to completion through this method is cached on the dataset (and its
+    /// clones), so that listing it again does not query the repository a second time. Every
+    /// entry is cloned into the cache, so one-shot consumers such as downloads should use
+    /// [`CrawlExt::crawl`]. Use [`Dataset::refresh`] to crawl again.
+    fn crawl_cached(
+        self,
+        client: &Client,
+        mp: impl ProgressManager,
+    ) -> BoxStream<'static, Result<Entry, Exn<CrawlerError>>> {
+        if let Some(entries) = self.cached_entries() {
+            return Box::pin(futures_util::stream::iter(
+                (0..entries.len()).map(move |idx| Ok(entries[idx].clone())),
+            ));
+        }
+
+        let root_dir = self.root_dir();
+        let entries = crawl(
+            client.clone(),
+            Arc::clone(&self.backend),
+            root_dir,
+            mp.clone(),
+        );
+        Box::pin(try_stream! {
+            let mut seen = Vec::new();
+            for await entry in entries {
+                let entry = entry?;
+                seen.push(entry.clone());
+                yield entry;
+            }
+            self.set_cached_entries(seen);
+        })
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::{
+        repo::{Endpoint, RepoError},
+        DatasetBackend, DirMeta, FileMeta,
+    };
+    use std::{
+        any::Any,
+        path::PathBuf,
+        sync::atomic::{AtomicUsize, Ordering},
+    };
+    use wiremock::matchers::{header, method, path};
+    use wiremock::{Mock, MockServer, ResponseTemplate};
+
+    fn body(len: usize) -> Vec<u8> {
+        (0..len).map(|i| (i % 251) as u8).collect()
+    }
+
+    fn sha256_hasher() -> Option<Hasher> {
+        Some(Hasher::Sha256(sha2::Sha256::new()))
+    }
+
+    fn tmp_file(name: &str) -> PathBuf {
+        std::env::temp_dir().join(format!("datahugger-ops-{}-{name}", std::process::id()))
+    }
+
+    async fn mount_range(server: &MockServer, data: &[u8], start: usize, end: usize, total: usize) {
+        Mock::given(method("GET"))
+            .and(path("/file"))
+            .and(header("range", format!("bytes={start}-{end}").as_str()))
+            .respond_with(
+                ResponseTemplate::new(206)
+                    .insert_header(
+                        "content-range",
+                        format!("bytes {start}-{end}/{total}").as_str(),
+                    )
+                    .set_body_bytes(data.to_vec()),
+            )
+            .mount(server)
+            .await;
+    }
+
+    #[tokio::test]
+    async fn test_write_response_ranged() {
+        let server = MockServer::start().await;
+        let data = body(10);
+        for (start, end) in [(0, 3), (4, 7), (8, 9)] {
+            mount_range(&server, &data[start..=end], start, end, data.len()).await;
+        }
+        let url = Url::parse(&format!("{}/file", server.uri())).unwrap();
+        let client = Client::new();
+        let dst = tmp_file("ranged");
+
+        let resp = request_file(&client, &url, Some(4)).await.unwrap();
+        assert_eq!(resp.status(), StatusCode::PARTIAL_CONTENT);
+        let mut hasher = sha256_hasher();
+        let got_size = write_response(
+            &client,
+            resp,
+            &dst,
+            Some(10),
+            Some(4),
+            &mut hasher,
+            &ProgressBar::hidden(),
+        )
+        .await
+        .unwrap();
+
+        assert_eq!(got_size, 10);
+        assert_eq!(fs::read(&dst).unwrap(), data);
+        assert_eq!(
+            hasher.unwrap().finalize(),
+            sha2::Sha256::digest(&data).to_vec()
+        );
+        fs::remove_file(&dst).unwrap();
+    }
+
+    #[tokio::test]
+    async fn test_write_response_range_ignored() {
+        // a server ignoring `Range` answers with the whole file, which is then streamed.
+        let server = MockServer::start().await;
+        let data = body(usize::try_from(BUFFERED_WRITE_LIMIT).unwrap() + 1);
+        Mock::given(method("GET"))
+            .and(path("/file"))
+            .respond_with(ResponseTemplate::new(200).set_body_bytes(data.clone()))
+            .mount(&server)
+            .await;
+        let url = Url::parse(&format!("{}/file", server.uri())).unwrap();
+        let client = Client::new();
+        let dst = tmp_file("range-ignored");
+
+        let resp = request_file(&client, &url, Some(4)).await.unwrap();
+        assert_eq!(resp.status(), StatusCode::OK);
+        let mut hasher = sha256_hasher();
+        let got_size = write_response(
+            &client,
+            resp,
+            &dst,
+            Some(data.len() as u64),
+            Some(4),
+            &mut hasher,
+            &ProgressBar::hidden(),
+        )
+        .await
+        .unwrap();
+
+        assert_eq!(got_size, data.len() as u64);
+        assert_eq!(fs::read(&dst).unwrap(), data);
+        assert_eq!(
+            hasher.unwrap().finalize(),
+            sha2::Sha256::digest(&data).to_vec()
+        );
+        fs::remove_file(&dst).unwrap();
+    }
+
+    #[tokio::test]
+    async fn test_write_response_ranged_wrong_length() {
+        let server = MockServer::start().await;
+        let data = body(10);
+        mount_range(&server, &data[0..=3], 0, 3, 10).await;
+        // one byte short
+        mount_range(&server, &data[4..=6], 4, 7, 10).await;
+        mount_range(&server, &data[8..=9], 8, 9, 10).await;
+        let url = Url::parse(&format!("{}/file", server.uri())).unwrap();
+        let client = Client::new();
+        let dst = tmp_file("ranged-wrong-length");
+
+        let resp = request_file(&client, &url, Some(4)).await.unwrap();
+        let err = write_response(
+            &client,
+            resp,
+            &dst,
+            Some(10),
+            Some(4),
+            &mut sha256_hasher(),
+            &ProgressBar::hidden(),
+        )
+        .await
+        .unwrap_err();
+        assert!(
+            err.message.contains("size wrong for bytes 4-7"),
+            "{}",
+            err.message
+        );
+        let _ = fs::remove_file(&dst);
+    }
+
+    #[tokio::test]
+    async fn test_write_response_ranged_total_mismatch() {
+        // the metadata claims 10 bytes, the server knows better.
+        let server = MockServer::start().await;
+        let data = body(12);
+        mount_range(&server, &data[0..=3], 0, 3, 12).await;
+        let url = Url::parse(&format!("{}/file", server.uri())).unwrap();
+        let client = Client::new();
+        let dst = tmp_file("ranged-total-mismatch");
+
+        let resp = request_file(&client, &url, Some(4)).await.unwrap();
+        let err = write_response(
+            &client,
+            resp,
+            &dst,
+            Some(10),
+            Some(4),
+            &mut sha256_hasher(),
+            &ProgressBar::hidden(),
+        )
+        .await
+        .unwrap_err();
+        assert!(err.message.contains("server reports 12"), "{}", err.message);
+        assert!(!dst.exists());
+    }
+
+    #[tokio::test]
+    async fn test_write_response_whole_body() {
+        let server = MockServer::start().await;
+        let data = body(1000);
+        Mock::given(method("GET"))
+            .and(path("/file"))
+            .respond_with(ResponseTemplate::new(200).set_body_bytes(data.clone()))
+            .mount(&server)
+            .await;
+        let url = Url::parse(&format!("{}/file", server.uri())).unwrap();
+        let client = Client::new();
+
+        // known size goes through the buffered write, unknown size is streamed, and a body
+        // larger than its metadata size spills over from the buffer to streaming.
+        for (name, size) in [
+            ("buffered", Some(1000)),
+            ("streamed", None),
+            ("understated", Some(100)),
+        ] {
+            let dst = tmp_file(name);
+            let resp = request_file(&client, &url, None).await.unwrap();
+            let mut hasher = sha256_hasher();
+            let got_size = write_response(
+                &client,
+                resp,
+                &dst,
+                size,
+                None,
+                &mut hasher,
+                &ProgressBar::hidden(),
+            )
+            .await
+            .unwrap();
+
+            assert_eq!(got_size, 1000);
+            assert_eq!(fs::read(&dst).unwrap(), data);
+            assert_eq!(
+                hasher.unwrap().finalize(),
+                sha2::Sha256::digest(&data).to_vec()
+            );
+            fs::remove_file(&dst).unwrap();
+        }
+    }
+
+    #[derive(Default)]
+    struct CountingBackend {
+        lists: Arc<AtomicUsize>,
+    }
+
+    #[async_trait]
+    impl DatasetBackend for CountingBackend {
+        async fn list(&self, _client: &Client, dir: DirMeta) -> Result<Vec<Entry>, Exn<RepoError>> {
+            self.lists.fetch_add(1, Ordering::SeqCst);
+            let file = FileMeta::new(
+                Some("a.txt".to_string()),
+                None,
+                dir.join("a.txt"),
+                Endpoint {
+                    parent_url: dir.api_url().clone(),
+                    key: None,
+                },
+                Url::parse("https://example.org/files/a.txt").unwrap(),
+                Some(1),
+                vec![],
+                None,
+                None,
+                None,
+                None,
+                true,
+            );
+            Ok(vec![Entry::File(file)])
+        }
+
+        fn root_url(&self) -> Url {
+            Url::parse("https://example.org/dataset").unwrap()
+        }
+
+        fn as_any(&self) -> &dyn Any {
+            self
+        }
+    }
+
+    #[tokio::test]
+    async fn test_crawl_cached_per_dataset() {
+        let backend = CountingBackend::default();
+        let lists = Arc::clone(&backend.lists);
+        let dataset = Dataset::new(backend);
+        let client = Client::new();
+        let mp = MultiProgress::with_draw_target(indicatif::ProgressDrawTarget::hidden());
+
+        // a plain crawl neither fills nor reads the cache
+        let _: Vec<Entry> = dataset
+            .clone()
+            .crawl(&client, mp.clone())
+            .try_collect()
+            .await
+            .unwrap();
+        assert!(dataset.cached_entries().is_none());
+
+        let first = dataset.clone().crawl_cached(&client, mp.clone());
+        let first: Vec<Entry> = first.try_collect().await.unwrap();
+        let again = dataset.clone().crawl_cached(&client, mp.clone());
+        let again: Vec<Entry> = again.try_collect().await.unwrap();
+        assert_eq!(lists.load(Ordering::SeqCst), 2);
+        assert_eq!(
+            format!("{first:?}"),
+            format!("{again:?}"),
+            "cached crawl replays the same entries"
+        );
+
+        let _: Vec<Entry> = dataset
+            .clone()
+            .crawl(&client, mp.clone())
+            .try_collect()
+            .await
+            .unwrap();
+        assert_eq!(lists.load(Ordering::SeqCst), 3);
+
+        dataset.refresh();
+        let _: Vec<Entry> = dataset
+            .crawl_cached(&client, mp)
+            .try_collect()
+            .await
+            .unwrap();
+        assert_eq!(lists.load(Ordering::SeqCst), 4);
+    }
+
+    #[test]
+    fn test_digest_matches() {
+        let digest = sha2::Sha256::digest(b"datahugger");
+        let hex_lower = hex::encode(digest);
+
+        assert!(digest_matches(&digest, &hex_lower));
+        assert!(digest_matches(&digest, &hex_lower.to_uppercase()));
+        // truncated, wrong or non-hex expectations never match
+        assert!(!digest_matches(&digest, &hex_lower[..62]));
+        assert!(!digest_matches(&digest, &hex_lower.replace('a', "b")));
+        assert!(!digest_matches(&digest, "not-a-checksum"));
+    }
 }
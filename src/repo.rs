@@ -4,7 +4,11 @@ use mime::Mime;
 use reqwest::Client;
 use url::Url;
 
-use std::{any::Any, path::Path, sync::Arc};
+use std::{
+    any::Any,
+    path::Path,
+    sync::{Arc, Mutex, PoisonError},
+};
 
 use digest::Digest;
 
@@ -151,7 +155,7 @@ impl Hasher {
 }
 
 #[allow(clippy::large_enum_variant)]
-#[derive(Debug)]
+#[derive(Debug, Clone)]
 pub enum Entry {
     Dir(DirMeta),
     File(FileMeta),
@@ -247,7 +251,7 @@ impl std::fmt::Display for Endpoint {
 /// validated against the file contents. As a result, it may be incorrect.
 /// For example, some APIs infer MIME types from file extensions rather
 /// than inspecting the actual data.
-#[derive(Debug)]
+#[derive(Debug, Clone)]
 pub struct FileMeta {
     filename: Option<String>,
     file_identifier: Option<String>,
@@ -432,6 +436,8 @@ pub trait DatasetBackend: Send + Sync + Any {
 #[derive(Clone)]
 pub struct Dataset {
     pub backend: Arc<dyn DatasetBackend>,
+    // entries of the last complete `CrawlExt::crawl_cached`, shared by all clones of the dataset.
+    entries: Arc<Mutex<Option<Arc<[Entry]>>>>,
 }
 
 impl Dataset {
@@ -439,10 +445,29 @@ impl Dataset {
     pub fn new(backend: impl DatasetBackend) -> Self {
         Dataset {
             backend: Arc::new(backend),
+            entries: Arc::default(),
         }
     }
     #[must_use]
     pub fn root_dir(&self) -> DirMeta {
         DirMeta::new_root(&self.backend.root_url())
     }
+
+    /// Entries found by the last `crawl_cached` of this dataset that ran to completion, if any.
+    #[must_use]
+    pub fn cached_entries(&self) -> Option<Arc<[Entry]>> {
+        self.entries
+            .lock()
+            .unwrap_or_else(PoisonError::into_inner)
+            .clone()
+    }
+
+    pub(crate) fn set_cached_entries(&self, entries: Vec<Entry>) {
+        *self.entries.lock().unwrap_or_else(PoisonError::into_inner) = Some(entries.into());
+    }
+
+    /// Forgets the cached crawl result, the next crawl lists the repository again.
+    pub fn refresh(&self) {
+        *self.entries.lock().unwrap_or_else(PoisonError::into_inner) = None;
+    }
 }
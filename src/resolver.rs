@@ -1,10 +1,12 @@
-use std::{collections::HashMap, str::FromStr};
+use std::{borrow::Cow, str::FromStr};
 
 use exn::{Exn, OptionExt, ResultExt};
+use futures_util::{stream, StreamExt};
 use reqwest::{
     header::{HeaderMap, HeaderValue, AUTHORIZATION, USER_AGENT},
     ClientBuilder,
 };
+use serde::Deserialize;
 use serde_json::Value as JsonValue;
 use url::Url;
 
@@ -17,7 +19,7 @@ use crate::{
 };
 
 use crate::helper::json_extract;
-use std::collections::HashSet;
+use std::collections::{BTreeMap, HashMap, HashSet};
 use std::sync::LazyLock;
 
 #[derive(Debug)]
@@ -212,6 +214,28 @@ async fn github_get_default_branch_commit(
     Ok(commit_sha)
 }
 
+// Response of the handle system REST API, see https://www.handle.net/proxy_servlet.html
+#[derive(Debug, Deserialize)]
+struct HandleResponse {
+    #[serde(rename = "responseCode")]
+    response_code: i64,
+    #[serde(default)]
+    values: Vec<HandleValue>,
+}
+
+#[derive(Debug, Deserialize)]
+struct HandleValue {
+    #[serde(rename = "type")]
+    typ: String,
+    data: HandleData,
+}
+
+#[derive(Debug, Deserialize)]
+struct HandleData {
+    // a string for 'URL' values, other types (e.g. 'HS_ADMIN') carry objects.
+    value: JsonValue,
+}
+
 async fn resolve_doi_to_url_with_base(
     client: &reqwest::Client,
     doi: &str,
@@ -225,10 +249,33 @@ async fn resolve_doi_to_url_with_base(
         });
     }
 
-    let base_url = base_url.unwrap_or("https://doi.org/api/handles");
+    let base_url = base_url.unwrap_or("https://doi.org");
+
+    if follow_redirects {
+        // The DOI proxy redirects to the registered URL. Following it with HEAD lands on the
+        // final page in one go, without asking the handle API first nor fetching any body.
+        // parsed once, the same url is sent and compared against where the request ended.
+        let proxy_url = Url::parse(&format!("{base_url}/{doi}")).or_raise(|| ResolveError {
+            message: format!("failed to resolve '{doi}': not a valid DOI url"),
+        })?;
+        let res = match client.head(proxy_url.clone()).send().await {
+            Ok(res) => res,
+            Err(err) => exn::bail!(ResolveError {
+                message: format!("failed to resolve '{doi}': {err:?}")
+            }),
+        };
+        let status = res.status();
+        // landing pages may refuse HEAD, only a proxy that did not redirect means unresolved.
+        if !status.is_success() && &proxy_url == res.url() {
+            exn::bail!(ResolveError {
+                message: format!("failed to resolve '{doi}': status {status}")
+            });
+        }
+        return Ok(res.url().as_str().to_owned());
+    }
 
     let res = match client
-        .get(format!("{}/{}", base_url, doi))
+        .get(format!("{base_url}/api/handles/{doi}"))
         .query(&[("type", "URL")])
         .send()
         .await
@@ -249,8 +296,8 @@ async fn resolve_doi_to_url_with_base(
         });
     }
 
-    let json: serde_json::Value = match res.json().await {
-        Ok(json) => json,
+    let handle: HandleResponse = match res.json().await {
+        Ok(handle) => handle,
         Err(err) => {
             exn::bail!(ResolveError {
                 message: format!("failed to parse response for '{doi}': {err:?}")
@@ -258,43 +305,30 @@ async fn resolve_doi_to_url_with_base(
         }
     };
 
-    let url = match json.get("responseCode").and_then(|v| v.as_i64()) {
-        Some(1) => match json.get("values").and_then(|v| v.as_array()) {
-            Some(values) if !values.is_empty() => {
-                match values[0]
-                    .get("data")
-                    .and_then(|d| d.get("value"))
-                    .and_then(|v| v.as_str())
-                {
-                    Some(url) => Ok::<String, Exn<ResolveError>>(url.to_string()),
-                    None => exn::bail!(ResolveError {
-                        message: format!("missing data.value for '{doi}'")
-                    }),
-                }
-            }
-            _ => exn::bail!(ResolveError {
-                message: format!("empty or missing values for '{doi}'")
-            }),
-        },
-        Some(code) => exn::bail!(ResolveError {
-            message: format!("unexpected responseCode {code} for '{doi}'")
-        }),
-        None => exn::bail!(ResolveError {
-            message: format!("missing responseCode for '{doi}'")
-        }),
-    }?;
-
-    if follow_redirects {
-        let res = match client.head(&url).send().await {
-            Ok(res) => res,
-            Err(err) => exn::bail!(ResolveError {
-                message: format!("failed to follow redirect for '{url}': {err:?}")
-            }),
-        };
-        Ok(res.url().to_string())
-    } else {
-        Ok(url)
+    if handle.response_code != 1 {
+        exn::bail!(ResolveError {
+            message: format!(
+                "unexpected responseCode {} for '{doi}'",
+                handle.response_code
+            )
+        });
     }
+
+    let Some(url) = handle
+        .values
+        .into_iter()
+        .filter(|v| v.typ == "URL")
+        .find_map(|v| match v.data.value {
+            JsonValue::String(url) => Some(url),
+            _ => None,
+        })
+    else {
+        exn::bail!(ResolveError {
+            message: format!("missing URL value for '{doi}'")
+        })
+    };
+
+    Ok(url)
 }
 
 pub async fn resolve_doi_to_url(
@@ -305,6 +339,149 @@ pub async fn resolve_doi_to_url(
     resolve_doi_to_url_with_base(client, doi, None, follow_redirects).await
 }
 
+async fn resolve_dois_to_urls_with_base<S>(
+    client: &reqwest::Client,
+    dois: &[S],
+    base_url: Option<&str>,
+    follow_redirects: bool,
+    concurrency: usize,
+) -> Vec<Result<String, Exn<ResolveError>>>
+where
+    S: AsRef<str>,
+{
+    let concurrency = if concurrency == 0 {
+        dois.len().max(1)
+    } else {
+        concurrency
+    };
+    // every request owns its DOI and client handle, so the stream stays lazy and `Send`. The
+    // DOIs are mapped through fn paths, a closure over `&S` is not general enough to be `Send`.
+    let client = client.clone();
+    let base_url = base_url.map(str::to_owned);
+    let mut results = stream::iter(dois.iter().map(S::as_ref).map(str::to_owned).enumerate())
+        .map(move |(idx, doi)| {
+            let client = client.clone();
+            let base_url = base_url.clone();
+            async move {
+                let url = resolve_doi_to_url_with_base(
+                    &client,
+                    &doi,
+                    base_url.as_deref(),
+                    follow_redirects,
+                )
+                .await;
+                (idx, url)
+            }
+        })
+        .buffer_unordered(concurrency)
+        .collect::<Vec<_>>()
+        .await;
+    results.sort_unstable_by_key(|(idx, _)| *idx);
+    results.into_iter().map(|(_, url)| url).collect()
+}
+
+/// Resolves many DOIs concurrently, sharing the connection pool of `client`.
+///
+/// At most `concurrency` DOIs are in flight at any time (`0` means no limit), so large
+/// batches neither keep every request alive at once nor exceed the per-client connection
+/// caps of the resolver. The results are returned in the same order as `dois`,
+/// one result per DOI.
+pub async fn resolve_dois_to_urls<S>(
+    client: &reqwest::Client,
+    dois: &[S],
+    follow_redirects: bool,
+    concurrency: usize,
+) -> Vec<Result<String, Exn<ResolveError>>>
+where
+    S: AsRef<str>,
+{
+    resolve_dois_to_urls_with_base(client, dois, None, follow_redirects, concurrency).await
+}
+
+/// Bounded memo of resolved DOIs, keyed by the DOI and whether redirects were followed.
+/// Once full, the least recently used resolution is evicted first.
+#[derive(Debug)]
+pub struct DoiCache {
+    capacity: usize,
+    // one map per `follow_redirects` value so that lookups borrow the DOI, each entry holds
+    // the URL and the tick of its last use.
+    urls: [HashMap<String, (String, u64)>; 2],
+    // last use tick -> key, oldest first.
+    by_use: BTreeMap<u64, (bool, String)>,
+    tick: u64,
+}
+
+impl DoiCache {
+    /// Creates an empty cache holding up to `capacity` resolutions (at least one).
+    #[must_use]
+    pub fn new(capacity: usize) -> Self {
+        DoiCache {
+            capacity: capacity.max(1),
+            urls: [HashMap::new(), HashMap::new()],
+            by_use: BTreeMap::new(),
+            tick: 0,
+        }
+    }
+
+    /// Number of cached resolutions.
+    #[must_use]
+    pub fn len(&self) -> usize {
+        self.by_use.len()
+    }
+
+    #[must_use]
+    pub fn is_empty(&self) -> bool {
+        self.by_use.is_empty()
+    }
+
+    /// Returns the URL `doi` resolved to, marking it as the most recently used.
+    ///
+    /// # Panics
+    ///
+    /// Panics if the recency index lost track of a cached DOI, which would be a bug.
+    pub fn get(&mut self, doi: &str, follow_redirects: bool) -> Option<String> {
+        let (url, used) = self.urls[usize::from(follow_redirects)].get_mut(doi)?;
+        self.tick += 1;
+        let key = self
+            .by_use
+            .remove(used)
+            .expect("every cached DOI has a last use");
+        *used = self.tick;
+        self.by_use.insert(self.tick, key);
+        Some(url.clone())
+    }
+
+    /// Remembers the URL `doi` resolved to, evicting the least recently used one when full.
+    /// A DOI that is already cached keeps its URL.
+    pub fn insert(&mut self, doi: String, follow_redirects: bool, url: String) {
+        if self.urls[usize::from(follow_redirects)].contains_key(&doi) {
+            return;
+        }
+        if self.by_use.len() >= self.capacity {
+            if let Some((_, (follow, oldest))) = self.by_use.pop_first() {
+                self.urls[usize::from(follow)].remove(&oldest);
+            }
+        }
+        self.tick += 1;
+        self.by_use
+            .insert(self.tick, (follow_redirects, doi.clone()));
+        self.urls[usize::from(follow_redirects)].insert(doi, (url, self.tick));
+    }
+}
+
+fn persistent_id(url: &Url) -> Option<Cow<'_, str>> {
+    url.query_pairs()
+        .find_map(|(key, value)| (key == "persistentId").then_some(value))
+}
+
+// e.g. https://demo.dataverse.org/dataset.xhtml?persistentId=doi:10.70122/FK2/ABCDEF
+fn is_dataverse_page(url: &Url) -> bool {
+    url.path_segments()
+        .and_then(|mut segments| segments.next())
+        .is_some_and(|typ| matches!(typ, "dataset.xhtml" | "file.xhtml"))
+        && persistent_id(url).is_some()
+}
+
 /// Resolves a dataset URL into a [`Dataset`] by dispatching based on the
 /// URL's domain and structure.
 ///
@@ -372,8 +549,9 @@ pub async fn resolve(url: &str) -> Result<Dataset, Exn<DispatchError>> {
         return Ok(dataset);
     }
 
-    // Dataverse spec hosted
-    if DATAVERSE_DOMAINS.contains(domain) {
+    // Dataverse spec hosted, the page URLs are specific enough to also route
+    // installations that are not (yet) in the domain list.
+    if DATAVERSE_DOMAINS.contains(domain) || is_dataverse_page(&url) {
         // https://dataverse.harvard.edu/dataset.xhtml?persistentId=doi:10.7910/DVN/KBHLOD
         // https://dataverse.harvard.edu/file.xhtml?persistentId=doi:10.7910/DVN/KBHLOD/JCJCJC
         let mut segments = url.path_segments().ok_or_else(|| DispatchError {
@@ -382,9 +560,7 @@ pub async fn resolve(url: &str) -> Result<Dataset, Exn<DispatchError>> {
         let typ = segments.next().ok_or_else(|| DispatchError {
             message: format!("'{url}' no segments found"),
         })?;
-        let queries = url.query_pairs();
-        let queries = queries.collect::<HashMap<_, _>>();
-        let Some(id) = queries.get("persistentId") else {
+        let Some(id) = persistent_id(&url) else {
             exn::bail!(DispatchError {
                 message: "query don't contains 'persistentId'".to_string()
             })
@@ -598,6 +774,49 @@ mod tests {
 
     use wiremock::matchers::{method, path, query_param};
     use wiremock::{Mock, MockServer, ResponseTemplate};
+
+    #[test]
+    fn test_doi_cache_hit_and_redirect_flag() {
+        let mut cache = DoiCache::new(4);
+        assert_eq!(cache.get("10.1/a", true), None);
+
+        cache.insert("10.1/a".to_string(), true, "https://a.org".to_string());
+        cache.insert("10.1/a".to_string(), false, "https://doi.org/a".to_string());
+        assert_eq!(cache.len(), 2);
+        assert_eq!(cache.get("10.1/a", true).as_deref(), Some("https://a.org"));
+        assert_eq!(
+            cache.get("10.1/a", false).as_deref(),
+            Some("https://doi.org/a")
+        );
+
+        // a cached DOI keeps its first URL
+        cache.insert("10.1/a".to_string(), true, "https://other.org".to_string());
+        assert_eq!(cache.len(), 2);
+        assert_eq!(cache.get("10.1/a", true).as_deref(), Some("https://a.org"));
+    }
+
+    #[test]
+    fn test_doi_cache_evicts_least_recently_used() {
+        let mut cache = DoiCache::new(2);
+        cache.insert("10.1/a".to_string(), true, "a".to_string());
+        cache.insert("10.1/b".to_string(), true, "b".to_string());
+        // the hit makes `b` the least recently used
+        assert_eq!(cache.get("10.1/a", true).as_deref(), Some("a"));
+
+        cache.insert("10.1/c".to_string(), false, "c".to_string());
+        assert_eq!(cache.len(), 2);
+        assert_eq!(cache.get("10.1/b", true), None);
+        assert_eq!(cache.get("10.1/a", true).as_deref(), Some("a"));
+        assert_eq!(cache.get("10.1/c", false).as_deref(), Some("c"));
+
+        // `a` was used before `c`, so it goes next, from the other map
+        cache.insert("10.1/d".to_string(), true, "d".to_string());
+        assert_eq!(cache.get("10.1/a", true), None);
+        assert_eq!(cache.get("10.1/c", false).as_deref(), Some("c"));
+        assert_eq!(cache.get("10.1/d", true).as_deref(), Some("d"));
+        assert_eq!(cache.len(), 2);
+    }
+
     #[tokio::test]
     async fn test_resolve_dataverse_default() {
         // dataset
@@ -616,6 +835,20 @@ mod tests {
         let qr = resolve(url).await.unwrap();
         let qr = qr.backend.as_any().downcast_ref::<DataverseFile>().unwrap();
         assert_eq!(qr.id.as_str(), "doi:10.7910/DVN/KBHLOD/DHJ45U");
+
+        // installation not in the domain list, routed by the page url
+        let url = "https://demo.dataverse.org/dataset.xhtml?persistentId=doi:10.70122/FK2/ABCDEF";
+        let qr = resolve(url).await.unwrap();
+        let qr = qr
+            .backend
+            .as_any()
+            .downcast_ref::<DataverseDataset>()
+            .unwrap();
+        assert_eq!(qr.id.as_str(), "doi:10.70122/FK2/ABCDEF");
+        assert_eq!(qr.base_url.as_str(), "https://demo.dataverse.org/");
+
+        let url = "https://demo.dataverse.org/dataset.xhtml";
+        assert!(resolve(url).await.is_err());
     }
 
     #[tokio::test]
@@ -684,7 +917,7 @@ mod tests {
         let mock_server = MockServer::start().await;
 
         Mock::given(method("GET"))
-            .and(path("/10.34894/0B7ZLK"))
+            .and(path("/api/handles/10.34894/0B7ZLK"))
             .and(query_param("type", "URL"))
             .respond_with(ResponseTemplate::new(200).set_body_json(serde_json::json!({
         "responseCode": 1,
@@ -742,4 +975,179 @@ mod tests {
             "Invalid DOI: 'https://doi.org/10.34894/0B7ZLK'"
         );
     }
+
+    #[tokio::test]
+    async fn test_resolve_doi_to_url_pick_url_value() {
+        let mock_server = MockServer::start().await;
+
+        Mock::given(method("GET"))
+            .and(path("/api/handles/10.34894/0B7ZLK"))
+            .respond_with(ResponseTemplate::new(200).set_body_json(serde_json::json!({
+                "responseCode": 1,
+                "values": [
+                    {
+                        "index": 100,
+                        "type": "HS_ADMIN",
+                        "data": {
+                            "format": "admin",
+                            "value": { "handle": "0.na/10.34894", "index": 200 }
+                        }
+                    },
+                    {
+                        "index": 1,
+                        "type": "URL",
+                        "data": {
+                            "format": "string",
+                            "value": "https://dataverse.nl/citation?persistentId=doi:10.34894/0B7ZLK"
+                        }
+                    }
+                ]
+            })))
+            .mount(&mock_server)
+            .await;
+
+        let client = reqwest::Client::builder()
+            .use_native_tls()
+            .timeout(Duration::from_secs(5))
+            .build()
+            .unwrap();
+
+        let url = resolve_doi_to_url_with_base(
+            &client,
+            "10.34894/0B7ZLK",
+            Some(&mock_server.uri()),
+            false,
+        )
+        .await
+        .unwrap();
+        assert_eq!(
+            url,
+            "https://dataverse.nl/citation?persistentId=doi:10.34894/0B7ZLK"
+        );
+    }
+
+    #[tokio::test]
+    async fn test_resolve_doi_to_url_follow_redirects() {
+        let mock_server = MockServer::start().await;
+
+        Mock::given(method("HEAD"))
+            .and(path("/10.34894/0B7ZLK"))
+            .respond_with(ResponseTemplate::new(302).insert_header(
+                "Location",
+                format!(
+                    "{}/citation?persistentId=doi:10.34894/0B7ZLK",
+                    mock_server.uri()
+                ),
+            ))
+            .mount(&mock_server)
+            .await;
+        Mock::given(method("HEAD"))
+            .and(path("/citation"))
+            .respond_with(ResponseTemplate::new(302).insert_header(
+                "Location",
+                format!(
+                    "{}/dataset.xhtml?persistentId=doi:10.34894/0B7ZLK",
+                    mock_server.uri()
+                ),
+            ))
+            .mount(&mock_server)
+            .await;
+        Mock::given(method("HEAD"))
+            .and(path("/dataset.xhtml"))
+            .respond_with(ResponseTemplate::new(200))
+            .mount(&mock_server)
+            .await;
+        Mock::given(method("HEAD"))
+            .and(path("/10.1234/NOTFOUND"))
+            .respond_with(ResponseTemplate::new(404))
+            .mount(&mock_server)
+            .await;
+
+        let client = reqwest::Client::builder()
+            .use_native_tls()
+            .timeout(Duration::from_secs(5))
+            .build()
+            .unwrap();
+
+        let url = resolve_doi_to_url_with_base(
+            &client,
+            "10.34894/0B7ZLK",
+            Some(&mock_server.uri()),
+            true,
+        )
+        .await
+        .unwrap();
+        assert_eq!(
+            url,
+            format!(
+                "{}/dataset.xhtml?persistentId=doi:10.34894/0B7ZLK",
+                mock_server.uri()
+            )
+        );
+
+        let res = resolve_doi_to_url_with_base(
+            &client,
+            "10.1234/NOTFOUND",
+            Some(&mock_server.uri()),
+            true,
+        )
+        .await;
+        assert!(res.is_err());
+    }
+
+    #[tokio::test]
+    async fn test_resolve_dois_to_urls_keep_order() {
+        let mock_server = MockServer::start().await;
+
+        for (doi, delay) in [("10.34894/0B7ZLK", 200), ("10.17026/DANS-2AC-ETD6", 0)] {
+            Mock::given(method("GET"))
+                .and(path(format!("/api/handles/{doi}")))
+                .and(query_param("type", "URL"))
+                .respond_with(
+                    ResponseTemplate::new(200)
+                        .set_delay(Duration::from_millis(delay))
+                        .set_body_json(serde_json::json!({
+                            "responseCode": 1,
+                            "values": [
+                                {
+                                    "index": 1,
+                                    "type": "URL",
+                                    "data": {
+                                        "format": "string",
+                                        "value": format!("https://example.org/citation?persistentId=doi:{doi}")
+                                    }
+                                }
+                            ]
+                        })),
+                )
+                .mount(&mock_server)
+                .await;
+        }
+
+        let client = reqwest::Client::builder()
+            .use_native_tls()
+            .timeout(Duration::from_secs(5))
+            .build()
+            .unwrap();
+
+        let res = resolve_dois_to_urls_with_base(
+            &client,
+            &["10.34894/0B7ZLK", "10.17026/DANS-2AC-ETD6", "not-a-doi"],
+            Some(&mock_server.uri()),
+            false,
+            2,
+        )
+        .await;
+
+        assert_eq!(res.len(), 3);
+        assert_eq!(
+            res[0].as_ref().unwrap(),
+            "https://example.org/citation?persistentId=doi:10.34894/0B7ZLK"
+        );
+        assert_eq!(
+            res[1].as_ref().unwrap(),
+            "https://example.org/citation?persistentId=doi:10.17026/DANS-2AC-ETD6"
+        );
+        assert!(res[2].is_err());
+    }
 }